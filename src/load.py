@@ -5,8 +5,7 @@
 # Copyright (C) 2023 Jeremy Rimpo
 # Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
 
-import json
-import math
+from os import makedirs
 from os.path import join, expanduser
 import requests
 import semantic_version
@@ -16,8 +15,11 @@ from tkinter import ttk, colorchooser as tkColorChooser
 import myNotebook as nb
 
 from navroute import const, overlay
+from navroute.engine import RouteEngine, Settings, Snapshot
 from navroute.format_util import Formatter
-from navroute.status_flags import StatusFlags2, StatusFlags
+from navroute.history import HistoryScanner, format_history
+from navroute.publisher import RoutePublisher
+from navroute.template import DisplayTemplates, DEFAULT_LABEL, DEFAULT_OVERLAY, DEFAULT_WRAP
 
 import EDMCLogging
 from config import config
@@ -35,15 +37,13 @@ class This:
         self.NAME = const.name
         self.formatter = Formatter()
 
+        self.data_dir: str = ''
         self.jump_num: tk.IntVar | None = None
 
         self.logger: EDMCLogging.LoggerMixin = get_plugin_logger(self.NAME)
-        self.current_system: str = "Unknown"
-        self.current_system_class: str | None = None
-        self.next_system_class: str | None = None
-        self.route: list[dict[str, Any]] = []
-        self.total_distance: float = 0
-        self.straight_distance: float = 0
+        self.engine: RouteEngine | None = None
+        self.snapshot: Snapshot | None = None
+        self.applied_version: int = 0
 
         self.parent: tk.Frame | None = None
         self.frame: tk.Frame | None = None
@@ -51,15 +51,24 @@ class This:
         self.remain_label: tk.Label | None = None
         self.navroute_label: tk.Label | None = None
         self.update_button: HyperlinkLabel | None = None
-        self.search_route: bool = False
-        self.remaining_jumps: int = 0
-        self.overcharge_boost: bool = False
-        self.status: StatusFlags = StatusFlags(0)
-        self.status2: StatusFlags2 = StatusFlags2(0)
+        self.history: HistoryScanner | None = None
+        self.history_label: tk.Label | None = None
+        self.history_stats: dict[str, float] | None = None
 
         self.show_distance: tk.BooleanVar | None = None
         self.show_starclass: tk.BooleanVar | None = None
         self.show_indicators: tk.BooleanVar | None = None
+        self.label_template: tk.StringVar | None = None
+        self.overlay_template: tk.StringVar | None = None
+        self.hop_template: tk.StringVar | None = None
+        self.wrap_width: tk.IntVar | None = None
+        self.templates: DisplayTemplates = DisplayTemplates()
+        self.use_reroute: tk.BooleanVar | None = None
+        self.reroute_boosts: tk.BooleanVar | None = None
+
+        self.publisher: RoutePublisher | None = None
+        self.use_publisher: tk.BooleanVar | None = None
+        self.publisher_port: tk.IntVar | None = None
 
         self.overlay = overlay.Overlay()
         self.use_overlay: tk.BooleanVar | None = None
@@ -75,14 +84,29 @@ this = This()
 
 
 def plugin_start3(plugin_dir: str) -> str:
+    this.data_dir = join(config.app_dir_path, 'navroute')
+    makedirs(this.data_dir, exist_ok=True)
+    this.history = HistoryScanner(join(this.data_dir, 'history_cache.json'))
+    this.engine = RouteEngine(this.data_dir, this.formatter, this.overlay, queue_snapshot)
+    this.engine.start()
     return const.name
 
 
+def plugin_stop() -> None:
+    this.engine.stop()
+    if this.publisher:
+        this.publisher.stop()
+
+
 def plugin_app(parent: tk.Frame) -> tk.Frame:
     parse_config()
+    update_publisher()
+    update_settings()
     this.parent = parent
     this.frame = tk.Frame(parent)
     this.frame.columnconfigure(0, weight=1)
+    this.frame.bind('<<NavRouteSnapshot>>', lambda event: apply_snapshot(this.snapshot))
+    this.frame.bind('<<NavRouteHistory>>', lambda event: show_history())
     this.remain_label = tk.Label(this.frame, text="NavRoute: Plot a Route to Begin")
     this.remain_label.grid(row=0)
     this.navroute_label = tk.Label(this.frame, text="No NavRoute Set")
@@ -93,6 +117,8 @@ def plugin_app(parent: tk.Frame) -> tk.Frame:
         url = f'https://github.com/Silarn/EDMC-NavRoute/releases/tag/v{update}'
         this.update_button = HyperlinkLabel(this.frame, text=text, url=url)
         this.update_button.grid(row=2, sticky=tk.N)
+    if this.snapshot:
+        apply_snapshot(this.snapshot)
     theme.update(this.frame)
     return this.frame
 
@@ -153,6 +179,16 @@ def plugin_prefs(parent: ttk.Notebook, cmdr: str, is_beta: bool) -> nb.Frame:
         variable=this.show_starclass,
         command=lambda: indicator_check.config(state=tk.DISABLED if not this.show_starclass.get() else tk.NORMAL)
     ).grid(row=12, padx=x_padding, pady=y_padding, column=0, sticky=tk.W)
+    nb.Checkbutton(
+        frame,
+        text='Suggest reroute from local star catalog',
+        variable=this.use_reroute
+    ).grid(row=13, padx=x_padding, pady=y_padding, column=0, sticky=tk.W)
+    nb.Checkbutton(
+        frame,
+        text='Use neutron / white dwarf boosts for reroute',
+        variable=this.reroute_boosts
+    ).grid(row=13, padx=x_padding, pady=y_padding, column=1, sticky=tk.W)
 
     # Overlay settings
     ttk.Separator(frame).grid(row=15, columnspan=3, pady=y_padding * 2, sticky=tk.EW)
@@ -209,6 +245,64 @@ def plugin_prefs(parent: ttk.Notebook, cmdr: str, is_beta: bool) -> nb.Frame:
         *size_options
     ).grid(row=24, padx=x_padding, pady=y_padding, column=0, sticky=tk.W)
 
+    # Publisher settings
+    ttk.Separator(frame).grid(row=25, columnspan=3, pady=y_padding * 2, sticky=tk.EW)
+
+    nb.Checkbutton(
+        frame,
+        text='Publish route state to local tools',
+        variable=this.use_publisher
+    ).grid(row=30, column=0, padx=x_button_padding, pady=0, sticky=tk.W)
+    port_frame = nb.Frame(frame)
+    port_frame.grid(row=30, column=1, sticky=tk.NSEW)
+    nb.Label(port_frame, text='Port:') \
+        .grid(row=0, column=0, sticky=tk.W)
+    nb.EntryMenu(
+        port_frame, text=this.publisher_port.get(), textvariable=this.publisher_port,
+        width=8, validate='all', validatecommand=(vcmd, '%P')
+    ).grid(row=0, column=1, sticky=tk.W)
+
+    # Display templates
+    ttk.Separator(frame).grid(row=35, columnspan=3, pady=y_padding * 2, sticky=tk.EW)
+
+    nb.Label(frame,
+             text='Display Templates',
+             justify=tk.LEFT) \
+        .grid(row=36, column=0, padx=x_padding, sticky=tk.NW)
+    nb.Label(
+        frame,
+        text='Fields: {system} {star} {jumps} {jump_count} {remaining} {total} {ratio} {straight} {efficiency} {route}'
+             ' {eta} {rate}'
+    ).grid(row=36, column=1, padx=x_padding, sticky=tk.W)
+    nb.Label(frame, text='Summary:').grid(row=37, padx=x_padding, sticky=tk.W)
+    nb.EntryMenu(frame, textvariable=this.label_template, width=80) \
+        .grid(row=37, column=1, padx=x_padding, pady=y_padding, sticky=tk.EW)
+    nb.Label(frame, text='Overlay:').grid(row=38, padx=x_padding, sticky=tk.W)
+    nb.EntryMenu(frame, textvariable=this.overlay_template, width=80) \
+        .grid(row=38, column=1, padx=x_padding, pady=y_padding, sticky=tk.EW)
+    nb.Label(frame, text='Route step:').grid(row=39, padx=x_padding, sticky=tk.W)
+    nb.EntryMenu(frame, textvariable=this.hop_template, width=80) \
+        .grid(row=39, column=1, padx=x_padding, pady=y_padding, sticky=tk.EW)
+    nb.Label(
+        frame,
+        text='Route step fields: {system} {star} {distance} {warning} (leave blank to use the settings above)'
+    ).grid(row=40, column=1, padx=x_padding, sticky=tk.W)
+    nb.Label(frame, text='Wrap Width:').grid(row=41, padx=x_padding, sticky=tk.W)
+    nb.EntryMenu(
+        frame, textvariable=this.wrap_width, width=8, validate='all', validatecommand=(vcmd, '%P')
+    ).grid(row=41, column=1, padx=x_padding, pady=y_padding, sticky=tk.W)
+
+    # Route history
+    ttk.Separator(frame).grid(row=45, columnspan=3, pady=y_padding * 2, sticky=tk.EW)
+
+    history_label = nb.Label(frame, text='Scan your journals for lifetime route statistics', justify=tk.LEFT)
+    history_label.grid(row=46, column=1, padx=x_padding, sticky=tk.W)
+    nb.Button(
+        frame,
+        text='Scan Journal History',
+        command=lambda: scan_history(history_label)
+    ).grid(row=46, column=0, padx=x_padding, pady=y_padding, sticky=tk.W)
+
     return frame
 
 
@@ -217,13 +311,23 @@ def prefs_changed(cmdr: str, is_beta: bool) -> None:
     config.set('navroute_distance', this.show_distance.get())
     config.set('navroute_starclass', this.show_starclass.get())
     config.set('navroute_indicators', this.show_indicators.get())
+    config.set('navroute_label_template', this.label_template.get())
+    config.set('navroute_overlay_template', this.overlay_template.get())
+    config.set('navroute_hop_template', this.hop_template.get())
+    config.set('navroute_wrap_width', this.wrap_width.get())
+    config.set('navroute_reroute', this.use_reroute.get())
+    config.set('navroute_reroute_boosts', this.reroute_boosts.get())
     config.set('navroute_overlay', this.use_overlay.get())
     config.set('navroute_overlay_color', this.overlay_color.get())
     config.set('navroute_overlay_size', this.overlay_size.get())
     config.set('navroute_overlay_anchor_x', this.overlay_anchor_x.get())
     config.set('navroute_overlay_anchor_y', this.overlay_anchor_y.get())
+    config.set('navroute_publisher', this.use_publisher.get())
+    config.set('navroute_publisher_port', this.publisher_port.get())
+    update_publisher()
     this.formatter.set_locale(config.get_str('language'))
-    process_jumps()
+    compile_templates()
+    update_settings()
 
 
 def parse_config() -> None:
@@ -231,12 +335,139 @@ def parse_config() -> None:
     this.show_distance = tk.BooleanVar(value=config.get_bool(key='navroute_distance', default=True))
     this.show_starclass = tk.BooleanVar(value=config.get_bool(key='navroute_starclass', default=True))
     this.show_indicators = tk.BooleanVar(value=config.get_bool(key='navroute_indicators', default=True))
+    this.label_template = tk.StringVar(value=config.get_str(key='navroute_label_template', default=DEFAULT_LABEL))
+    this.overlay_template = tk.StringVar(value=config.get_str(key='navroute_overlay_template', default=DEFAULT_OVERLAY))
+    this.hop_template = tk.StringVar(value=config.get_str(key='navroute_hop_template', default=''))
+    this.wrap_width = tk.IntVar(value=config.get_int(key='navroute_wrap_width', default=DEFAULT_WRAP))
+    this.use_reroute = tk.BooleanVar(value=config.get_bool(key='navroute_reroute', default=False))
+    this.reroute_boosts = tk.BooleanVar(value=config.get_bool(key='navroute_reroute_boosts', default=False))
     this.use_overlay = tk.BooleanVar(value=config.get_bool(key='navroute_overlay', default=False))
     this.overlay_color = tk.StringVar(value=config.get_str(key='navroute_overlay_color', default='#ffffff'))
     this.overlay_size = tk.StringVar(value=config.get_str(key='navroute_overlay_size', default='Normal'))
     this.overlay_anchor_x = tk.IntVar(value=config.get_int(key='navroute_overlay_anchor_x', default=0))
     this.overlay_anchor_y = tk.IntVar(value=config.get_int(key='navroute_overlay_anchor_y', default=1040))
+    this.use_publisher = tk.BooleanVar(value=config.get_bool(key='navroute_publisher', default=False))
+    this.publisher_port = tk.IntVar(value=config.get_int(key='navroute_publisher_port', default=21210))
     this.formatter.set_locale(config.get_str('language'))
+    compile_templates()
+
+
+def compile_templates() -> None:
+    """
+    Compile the display templates from the current settings. Falls back to the default layout if a template is
+    invalid.
+    """
+
+    try:
+        this.templates = DisplayTemplates(
+            this.show_distance.get(), this.show_starclass.get(), this.show_indicators.get(),
+            this.label_template.get() or DEFAULT_LABEL, this.overlay_template.get() or DEFAULT_OVERLAY,
+            this.hop_template.get(), this.wrap_width.get()
+        )
+    except ValueError as ex:
+        this.logger.error('Invalid display template, using defaults', exc_info=ex)
+        this.templates = DisplayTemplates(
+            this.show_distance.get(), this.show_starclass.get(), this.show_indicators.get()
+        )
+
+
+def update_publisher() -> None:
+    """
+    Start, restart or stop the route state publisher to match the current settings.
+    """
+
+    if this.publisher and (not this.use_publisher.get() or this.publisher.port != this.publisher_port.get()):
+        this.publisher.stop()
+        this.publisher = None
+    if this.use_publisher.get() and not this.publisher:
+        this.publisher = RoutePublisher(this.publisher_port.get())
+        this.publisher.start()
+    this.engine.submit('publisher', this.publisher)
+
+
+def update_settings() -> None:
+    """
+    Hand an immutable copy of the current preferences to the route engine.
+    """
+
+    this.engine.submit('settings', Settings(
+        expanduser(config.get_str('journaldir', default=config.default_journal_dir)),
+        this.jump_num.get(),
+        this.templates,
+        this.use_reroute.get(),
+        this.reroute_boosts.get(),
+        this.overlay_color.get(),
+        this.overlay_size.get(),
+        this.overlay_anchor_x.get(),
+        this.overlay_anchor_y.get()
+    ))
+
+
+def queue_snapshot(snapshot: Snapshot) -> None:
+    """
+    Called from the route engine thread. Tk isn't thread-safe, so the Tk thread is only signalled with a virtual
+    event and applies the latest snapshot itself.
+
+    :param snapshot: New display state
+    """
+
+    this.snapshot = snapshot
+    if this.frame:
+        try:
+            this.frame.event_generate('<<NavRouteSnapshot>>', when='tail')
+        except tk.TclError:
+            pass  # EDMC is shutting down
+
+
+def apply_snapshot(snapshot: Snapshot | None) -> None:
+    """
+    Update the display from a route engine snapshot. Snapshots superseded by a newer one are dropped.
+
+    :param snapshot: Display state to apply
+    """
+
+    if snapshot is None or snapshot is not this.snapshot or snapshot.version <= this.applied_version:
+        return
+    this.applied_version = snapshot.version
+    this.remain_label['text'] = snapshot.summary
+    this.navroute_label['text'] = snapshot.display
+
+
+def scan_history(label: tk.Label) -> None:
+    """
+    Start a background scan of the journal archive and show the results in the given label.
+
+    :param label: Preferences label for the results
+    """
+
+    this.history_label = label
+    journal_dir = expanduser(config.get_str('journaldir', default=config.default_journal_dir))
+    if this.history.start(journal_dir, queue_history):
+        label['text'] = 'Scanning journals...'
+
+
+def queue_history(stats: dict[str, float] | None) -> None:
+    """
+    Called from the history scan thread. Signals the Tk thread to show the results.
+
+    :param stats: Combined statistics, or None if the scan failed
+    """
+
+    this.history_stats = stats
+    if this.frame:
+        try:
+            this.frame.event_generate('<<NavRouteHistory>>', when='tail')
+        except tk.TclError:
+            pass  # EDMC is shutting down
+
+
+def show_history() -> None:
+    try:
+        if this.history_label:
+            this.history_label['text'] = \
+                format_history(this.history_stats, this.formatter) if this.history_stats else 'Journal scan failed'
+    except tk.TclError:
+        pass  # Preferences window was closed
 
 
 def version_check() -> str:
@@ -267,164 +498,18 @@ def validate_int(val: str) -> bool:
     return False
 
 
-def parse_navroute():
-    journal_dir = config.get_str('journaldir', default=config.default_journal_dir)
-    logdir = expanduser(journal_dir)
-    try:
-        with open(join(logdir, 'NavRoute.json')) as f:
-            raw = f.read()
-
-        try:
-            data = json.loads(raw)
-            if data is not None:
-                this.route = data['Route']
-                this.remaining_jumps = len(this.route) - 1
-                this.search_route = True
-                parse_total_distance()
-
-        except json.JSONDecodeError as e:
-            this.logger.exception('Failed to decode NavRoute.json', exc_info=e)
-    except OSError as e:
-        this.logger.exception(f'Could not open navroute file.', exc_info=e)
-
-
-def can_display_overlay(status: StatusFlags | None = None) -> bool:
-    if status is None:
-        status = this.status
-    if ((StatusFlags.IN_SHIP in status) and not (StatusFlags.DOCKED in status)
-            and not (StatusFlags.LANDED in status)):
-        return True
-    return False
-
-
 def journal_entry(cmdr: str, is_beta: bool, system: str,
                   station: str, entry: MutableMapping[str, Any], state: Mapping[str, Any]) -> str:
-    if this.current_system is None:
-        parse_navroute()
-    if system != this.current_system:
-        this.current_system = system if system is not None else ''
-        this.current_system_class = None
-    if state['NavRoute'] is not None and state['NavRoute']['Route'] != this.route:
-        this.route = state['NavRoute']['Route']
-        this.remaining_jumps = 0
-        this.search_route = True
-        parse_total_distance()
-
-    this.overcharge_boost = False
-    if state and 'FrameShiftDrive' in state.get('Modules', {}):
-        if state['Modules']['FrameShiftDrive']['Item'] == 'int_hyperdrive_overcharge_size8_class5_overchargebooster_mkii':
-            this.overcharge_boost = True
-
-    if entry['event'] == 'FSDTarget':
-        found = False
-        if this.route:
-            for nav in this.route:
-                if nav['StarSystem'] == entry['Name']:
-                    found = True
-                    break
-        if found:
-            this.remaining_jumps = entry['RemainingJumpsInRoute']
-        else:
-            parse_navroute()
-
-    if this.route and this.search_route:
-        for i, nav in enumerate(this.route):
-            if nav['StarSystem'] == this.current_system:
-                this.current_system_class = nav['StarClass']
-                this.remaining_jumps = len(this.route) - (i + 1)
-                break
-
-    match entry['event']:
-        case 'NavRoute':
-            if state['NavRoute'] is not None:
-                this.route = state['NavRoute']['Route']
-            else:
-                this.route = entry['Route']
-            this.remaining_jumps = len(this.route) - 1 if this.route else 0
-            this.search_route = True
-            parse_total_distance()
-            process_jumps()
-        case 'NavRouteClear':
-            if StatusFlags.FSD_JUMP_IN_PROGRESS not in this.status:
-                this.remaining_jumps = 0
-                this.route.clear()
-                this.search_route = False
-                this.remain_label['text'] = "NavRoute: NavRoute Cleared"
-                this.navroute_label['text'] = "Plot a Route to Begin"
-                this.total_distance = 0
-                if this.overlay.available() and can_display_overlay():
-                    this.overlay.draw('navroute_display', 'NavRoute Cleared', this.overlay_anchor_x.get(),
-                                      this.overlay_anchor_y.get(), this.overlay_color.get(),
-                                      this.overlay_size.get().lower(), 10)
-        case 'StartJump':
-            this.next_system_class = entry['StarClass']
-        case 'FSDJump':
-            if this.next_system_class:
-                this.current_system_class = this.next_system_class
-                this.next_system_class = None
-            if len(this.route):
-                if entry['StarSystem'] == this.route[-1]['StarSystem']:
-                    this.remain_label['text'] = 'NavRoute: Route Complete!'
-                    this.navroute_label['text'] = 'No NavRoute Destination Set'
-                    this.remaining_jumps = 0
-                    this.route.clear()
-                    this.search_route = False
-                    this.total_distance = 0
-                    if this.overlay.available() and can_display_overlay():
-                        this.overlay.draw('navroute_display', 'NavRoute Complete!',
-                                          this.overlay_anchor_x.get(), this.overlay_anchor_y.get(),
-                                          this.overlay_color.get(), this.overlay_size.get().lower(), 10)
-                else:
-                    found = False
-                    for nav in this.route:
-                        if nav['StarSystem'] == entry['StarSystem']:
-                            found = True
-                            break
-                    if found:
-                        process_jumps()
-                    else:
-                        this.remain_label['text'] = 'NavRoute: Diverted From Route!'
-                        nearest_system = ('', -1)
-                        for nav in this.route:
-                            distance = get_distance(entry['StarPos'], nav['StarPos'])
-                            if nearest_system[1] == -1 or distance < nearest_system[1]:
-                                nearest_system = (nav['StarSystem'], distance)
-                        divert_text = f'Recalculate or Jump\n{nearest_system[0]} to Resume\n({this.formatter.format_distance(nearest_system[1], 'ly', False)})'
-                        this.navroute_label['text'] = divert_text
-                        if this.overlay.available() and can_display_overlay():
-                            this.overlay.display('navroute_display', divert_text.replace('\n', ' '), this.overlay_anchor_x.get(),
-                                                 this.overlay_anchor_y.get(), this.overlay_color.get())
-            else:
-                this.remain_label['text'] = 'NavRoute: No NavRoute Set'
-                this.navroute_label['text'] = 'Plot a Route to Begin'
-                if this.overlay.available() and can_display_overlay():
-                    this.overlay.clear('navroute_display')
-
-    if this.search_route:
-        this.search_route = False
-        process_jumps()
-
+    this.engine.submit('journal', system, entry, state['NavRoute'],
+                       (state.get('Modules') or {}).get('FrameShiftDrive'))
     return ''
 
 
-def get_distance(a: tuple[float, float, float], b: tuple[float, float, float]) -> float:
-    return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
-
-
-def parse_total_distance() -> None:
-    this.straight_distance = get_distance(this.route[0]['StarPos'], this.route[-1]['StarPos'])
-    total_distance = 0
-    last_pos = this.route[0]['StarPos']
-    for i, nav in enumerate(this.route[1:]):
-        total_distance += get_distance(nav['StarPos'], last_pos)
-        last_pos = nav['StarPos']
-    this.total_distance = total_distance
-
-
 def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, any]) -> str:
     """
     EDMC dashboard entry hook. Parses updates to the Status.json.
-    Used to determine planetary location data. Used by waypoints, organic scans, and display focus.
+    Used to determine whether the overlay can be displayed, and to track the jump target and FSD state ahead of the
+    journal.
 
     :param cmdr: Commander name (unused)
     :param is_beta: Beta status (unused)
@@ -432,82 +517,5 @@ def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, any]) -> str:
     :return: Result string. Empty means success.
     """
 
-    old_status = this.status
-    this.status = StatusFlags(entry['Flags'])
-    this.status2 = StatusFlags2(0)
-    if 'Flags2' in entry:
-        this.status2 = StatusFlags2(entry['Flags2'])
-
-    if can_display_overlay(old_status) != can_display_overlay():
-        process_jumps()
-
+    this.engine.submit('dashboard', entry)
     return ''
-
-
-def star_display(star_class: str | None, indicators: bool = True) -> str:
-    if star_class is None:
-        return ''
-
-    if indicators:
-        match star_class:
-            case 'M' | 'K' | 'G' | 'F' | 'A' | 'B' | 'O':
-                return f'\N{FUEL PUMP}{star_class}'
-            case 'N':
-                return '\N{HIGH VOLTAGE SIGN}{}N'.format('×6 ' if this.overcharge_boost else '×4 ')
-
-        if star_class.startswith('D'):
-            return '\N{HIGH VOLTAGE SIGN}{}{}'.format('×3 ' if this.overcharge_boost else '×1.5 ', star_class)
-
-    return star_class
-
-
-def process_jumps() -> None:
-    if not this.route:
-        this.remain_label['text'] = 'NavRoute: No NavRoute Set'
-        this.navroute_label['text'] = 'Plot a Route to Begin'
-
-        if this.overlay.available() and can_display_overlay():
-            this.overlay.clear('navroute_display')
-        return
-
-    remaining_route = this.route[-this.remaining_jumps:]
-    route_from_here = this.route[-(this.remaining_jumps+1):]
-    last_system = this.route[-1]
-    display = '{}{}'.format(this.current_system, f' [{star_display(this.current_system_class, this.show_indicators.get())}]')
-    remaining_distance = 0
-
-    for i, jump in enumerate(remaining_route):
-        if i >= this.jump_num.get() or i == (len(remaining_route)):
-            remainder_distance = 0
-            for j, jump_remainder in enumerate(remaining_route[i:]):
-                remainder_distance += get_distance(jump_remainder['StarPos'], remaining_route[i-1:][j]['StarPos'])
-            remaining_distance += remainder_distance
-            display += ((f' - {this.formatter.format_distance(remainder_distance, 'ly', False)} -> ' if this.show_distance.get() else ' -> ') +
-                        f'{last_system["StarSystem"]} [{star_display(last_system["StarClass"], this.show_indicators.get())}]') if this.show_starclass.get() \
-                else f' - {this.formatter.format_distance(remainder_distance, 'ly', False)} -> {last_system["StarSystem"]}'
-            break
-        else:
-            distance = get_distance(jump['StarPos'], route_from_here[i]['StarPos'])
-            remaining_distance += distance
-            display += ((f' - {this.formatter.format_distance(distance, 'ly', False)} -> ' if this.show_distance.get() else ' -> ') +
-                        f'{jump["StarSystem"]}' + f' [{star_display(jump["StarClass"], this.show_indicators.get())}]') if this.show_starclass.get() \
-                else f' - {this.formatter.format_distance(distance, 'ly', False)} -> {jump["StarSystem"]}' if this.show_distance.get() else f'{jump["StarSystem"]}'
-            if i == (this.jump_num.get() - 1) and i < len(remaining_route) - 2:
-                display += f' | +{this.remaining_jumps - this.jump_num.get() - 1} Jump{"s"[:this.remaining_jumps ^ 1]}'
-
-    if len(display) > 60:
-        display = '\n-> '.join(display.split(' -> '))
-
-    distance_ratio = f'{this.formatter.format_distance(remaining_distance, '', False)}/{this.formatter.format_distance(this.total_distance, 'ly', False)}'
-    this.remain_label['text'] = (f'NavRoute ({this.formatter.format_distance(this.straight_distance, 'ly', False)},'
-                                 f' {(this.straight_distance/this.total_distance*100):.1f}% efficiency)\n '
-                                 f'{this.remaining_jumps} Jump{"s"[:this.remaining_jumps ^ 1]} Remaining ({distance_ratio})')
-    this.navroute_label['text'] = display
-
-    if this.overlay.available():
-        if can_display_overlay():
-            overlay_text = f'{this.remaining_jumps} Jump{"s"[:this.remaining_jumps ^ 1]} ({distance_ratio}): ' + display.replace('\n', ' ')
-            this.overlay.display('navroute_display', overlay_text, this.overlay_anchor_x.get(),
-                                 this.overlay_anchor_y.get(), this.overlay_color.get(), this.overlay_size.get().lower())
-        else:
-            this.overlay.clear('navroute_display')
@@ -0,0 +1,484 @@
+import json
+import queue
+import threading
+from os.path import join
+from typing import Any, Callable, NamedTuple
+
+from EDMCLogging import get_plugin_logger
+from navroute import const
+from navroute.format_util import Formatter
+from navroute.fuel import FrameShiftDrive, FuelTable, parse_fsd
+from navroute.jump_log import JumpLog, JumpStats, parse_timestamp
+from navroute.overlay import Overlay
+from navroute.publisher import RoutePublisher
+from navroute.reroute import Rerouter
+from navroute.route import Route, divert_text, plural, render_route
+from navroute.status_flags import StatusFlags, StatusFlags2
+from navroute.template import DisplayTemplates
+
+logger = get_plugin_logger(const.name)
+
+MK2_BOOSTER = 'int_hyperdrive_overcharge_size8_class5_overchargebooster_mkii'
+
+
+class Settings(NamedTuple):
+    """
+    Immutable copy of the plugin preferences used by the route engine.
+    """
+
+    journal_dir: str
+    jump_num: int
+    templates: DisplayTemplates
+    use_reroute: bool
+    reroute_boosts: bool
+    overlay_color: str
+    overlay_size: str
+    overlay_x: int
+    overlay_y: int
+
+
+class Snapshot(NamedTuple):
+    """
+    Immutable display state produced by the route engine. Versions increase with each new snapshot.
+    """
+
+    version: int
+    summary: str
+    display: str
+
+
+class RouteEngine:
+    """
+    Owns the route state and does all route processing on a worker thread. The EDMC hooks only queue events. Once a
+    batch of queued events is processed, a new Snapshot is handed to the snapshot callback if the display changed.
+    Overlay updates and route state publishing are also done from the worker thread.
+    """
+
+    def __init__(self, data_dir: str, formatter: Formatter, overlay: Overlay,
+                 on_snapshot: Callable[[Snapshot], None]):
+        self.formatter: Formatter = formatter
+        self.overlay: Overlay = overlay
+        self.on_snapshot: Callable[[Snapshot], None] = on_snapshot
+        self.settings: Settings | None = None
+        self.publisher: RoutePublisher | None = None
+        self.rerouter: Rerouter = Rerouter(join(data_dir, 'catalog.csv'))
+        self.jump_log: JumpLog = JumpLog(join(data_dir, 'jumps.bin'))
+        self.jump_stats: JumpStats = JumpStats()
+
+        self.current_system: str = 'Unknown'
+        self.current_system_class: str | None = None
+        self.next_system_class: str | None = None
+        self.route: Route = Route()
+        self.search_route: bool = False
+        self.remaining_jumps: int = 0
+        self.overcharge_boost: bool = False
+        self.max_jump_range: float = 0
+        self.fsd: FrameShiftDrive | None = None
+        self.unladen_mass: float = 0
+        self.fuel_capacity: float = 0
+        self.fuel_level: float | None = None
+        self.cargo: float = 0
+        self.fuel_table: FuelTable | None = None
+        self.destination_index: int | None = None
+        self.hyperspace_jump: bool = False
+        self.pending_jump: tuple[list[dict[str, Any]], int, str, str, str] | None = None
+        self.divert_text: str = ''
+        self.diverted: bool = False
+        self.status: StatusFlags = StatusFlags(0)
+        self.status2: StatusFlags2 = StatusFlags2(0)
+
+        self.summary: str = 'NavRoute: Plot a Route to Begin'
+        self.display: str = 'No NavRoute Set'
+        self._version: int = 0
+        self._emitted: tuple[str, str] = (self.summary, self.display)
+        self._queue: queue.SimpleQueue[tuple[str, tuple]] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='NavRoute engine', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._queue.put(('stop', ()))
+        self._thread.join(1)
+
+    def submit(self, kind: str, *args: Any) -> None:
+        """
+        Queue an event for the worker thread. Safe to call from any thread.
+
+        :param kind: Event type: 'journal', 'dashboard', 'settings', 'publisher' or 'reroute'
+        :param args: Event arguments
+        """
+
+        self._queue.put((kind, args))
+
+    def _run(self) -> None:
+        self.jump_log.replay(self.jump_stats)
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for kind, args in batch:
+                try:
+                    match kind:
+                        case 'stop':
+                            return
+                        case 'journal':
+                            self._journal_entry(*args)
+                        case 'dashboard':
+                            self._dashboard_entry(*args)
+                        case 'settings':
+                            self.settings = args[0]
+                            if self.settings.use_reroute:
+                                self.rerouter.load()
+                            self._process_jumps()
+                        case 'publisher':
+                            self.publisher = args[0]
+                        case 'reroute':
+                            self._show_reroute(*args)
+                except Exception as ex:
+                    logger.exception(f'Failed to process {kind} event', exc_info=ex)
+            try:
+                self._emit()
+            except Exception as ex:
+                logger.exception('Failed to emit route state', exc_info=ex)
+
+    def _emit(self) -> None:
+        self._publish_state()
+        if (self.summary, self.display) == self._emitted:
+            return
+        self._emitted = (self.summary, self.display)
+        self._version += 1
+        self.on_snapshot(Snapshot(self._version, self.summary, self.display))
+
+    def _publish_state(self) -> None:
+        if not self.publisher:
+            return
+        next_system = None
+        if self.route and 0 < self.remaining_jumps < len(self.route):
+            next_system = self.route[-self.remaining_jumps]['StarSystem']
+        self.publisher.publish({
+            'current_system': self.current_system,
+            'current_star_class': self.current_system_class,
+            'next_system': next_system,
+            'destination': self.route[-1]['StarSystem'] if self.route else None,
+            'route_length': len(self.route),
+            'remaining_jumps': self.remaining_jumps,
+            'total_distance': self.route.total_distance,
+            'straight_distance': self.route.straight_distance,
+            'diverted': self.diverted,
+        })
+
+    def can_display_overlay(self, status: StatusFlags | None = None) -> bool:
+        if status is None:
+            status = self.status
+        if ((StatusFlags.IN_SHIP in status) and not (StatusFlags.DOCKED in status)
+                and not (StatusFlags.LANDED in status)):
+            return True
+        return False
+
+    def _overlay_ready(self) -> bool:
+        return self.settings is not None and self.overlay.available() and self.can_display_overlay()
+
+    def _parse_navroute(self) -> None:
+        if not self.settings:
+            return
+        try:
+            with open(join(self.settings.journal_dir, 'NavRoute.json')) as f:
+                raw = f.read()
+
+            try:
+                data = json.loads(raw)
+                if data is not None:
+                    self.route.load(data['Route'])
+                    self.remaining_jumps = len(self.route) - 1
+                    self.search_route = True
+
+            except json.JSONDecodeError as e:
+                logger.exception('Failed to decode NavRoute.json', exc_info=e)
+        except OSError as e:
+            logger.exception(f'Could not open navroute file.', exc_info=e)
+
+    def _journal_entry(self, system: str | None, entry: dict[str, Any], nav_route: dict[str, Any] | None,
+                       fsd: dict[str, Any] | None) -> None:
+        if system != self.current_system:
+            self.current_system = system if system is not None else ''
+            self.current_system_class = None
+        if nav_route is not None and self.route.changed(nav_route['Route']):
+            self.route.load(nav_route['Route'])
+            self.remaining_jumps = 0
+            self.search_route = True
+
+        self.overcharge_boost = fsd is not None and fsd['Item'] == MK2_BOOSTER
+
+        if entry['event'] == 'FSDTarget':
+            if self.route.index(entry['Name']) is not None:
+                self.remaining_jumps = entry['RemainingJumpsInRoute']
+            else:
+                self._parse_navroute()
+
+        if self.route and self.search_route:
+            i = self.route.index(self.current_system)
+            if i is not None:
+                self.current_system_class = self.route[i]['StarClass']
+                self.remaining_jumps = len(self.route) - (i + 1)
+
+        if entry['event'] in ('FSDJump', 'NavRoute', 'NavRouteClear'):
+            self.rerouter.cancel()
+
+        match entry['event']:
+            case 'Loadout':
+                self.max_jump_range = entry.get('MaxJumpRange', 0)
+                self.fsd = parse_fsd(fsd, entry.get('Modules'))
+                self.unladen_mass = entry.get('UnladenMass', 0)
+                self.fuel_capacity = entry.get('FuelCapacity', {}).get('Main', 0)
+                self._refresh_fuel()
+            case 'RefuelAll':
+                self.fuel_level = self.fuel_capacity
+                self._refresh_fuel()
+            case 'RefuelPartial':
+                if self.fuel_level is not None:
+                    self.fuel_level = min(self.fuel_level + entry.get('Amount', 0), self.fuel_capacity)
+                self._refresh_fuel()
+            case 'FuelScoop':
+                self.fuel_level = entry.get('Total', self.fuel_level)
+                self._refresh_fuel()
+            case 'NavRoute':
+                if nav_route is not None:
+                    self.route.load(nav_route['Route'])
+                else:
+                    self.route.load(entry['Route'])
+                self.remaining_jumps = len(self.route) - 1 if self.route else 0
+                self.search_route = True
+                self._process_jumps()
+            case 'NavRouteClear':
+                if StatusFlags.FSD_JUMP_IN_PROGRESS not in self.status:
+                    self.remaining_jumps = 0
+                    self.route.clear()
+                    self.diverted = False
+                    self.search_route = False
+                    self.summary = 'NavRoute: NavRoute Cleared'
+                    self.display = 'Plot a Route to Begin'
+                    if self._overlay_ready():
+                        self.overlay.draw('navroute_display', 'NavRoute Cleared', self.settings.overlay_x,
+                                          self.settings.overlay_y, self.settings.overlay_color,
+                                          self.settings.overlay_size.lower(), 10)
+            case 'StartJump':
+                # Supercruise entry also charges the FSD, but doesn't leave the system
+                self.hyperspace_jump = entry.get('JumpType', 'Hyperspace') == 'Hyperspace'
+                if self.hyperspace_jump:
+                    self.next_system_class = entry['StarClass']
+                    if self.status & (StatusFlags.FSD_CHARGING | StatusFlags.FSD_JUMP_IN_PROGRESS):
+                        self._prepare_jump()
+            case 'FSDJump':
+                self._record_jump(entry)
+                self.hyperspace_jump = False
+                self.pending_jump = None
+                self.fuel_level = entry.get('FuelLevel', self.fuel_level)
+                if self.next_system_class:
+                    self.current_system_class = self.next_system_class
+                    self.next_system_class = None
+                if len(self.route):
+                    if entry['StarSystem'] == self.route[-1]['StarSystem']:
+                        self.summary = 'NavRoute: Route Complete!'
+                        self.display = 'No NavRoute Destination Set'
+                        self.remaining_jumps = 0
+                        self.route.clear()
+                        self.diverted = False
+                        self.search_route = False
+                        if self._overlay_ready():
+                            self.overlay.draw('navroute_display', 'NavRoute Complete!',
+                                              self.settings.overlay_x, self.settings.overlay_y,
+                                              self.settings.overlay_color, self.settings.overlay_size.lower(), 10)
+                    elif self.route.index(entry['StarSystem']) is not None:
+                        self._process_jumps()
+                    else:
+                        self._divert(entry)
+                else:
+                    self.summary = 'NavRoute: No NavRoute Set'
+                    self.display = 'Plot a Route to Begin'
+                    if self._overlay_ready():
+                        self.overlay.clear('navroute_display')
+
+        if self.search_route:
+            self.search_route = False
+            self._process_jumps()
+
+    def _record_jump(self, entry: dict[str, Any]) -> None:
+        try:
+            timestamp = parse_timestamp(entry['timestamp'])
+            if timestamp > self.jump_stats.last_timestamp:
+                self.jump_stats.update(timestamp, entry.get('JumpDist', 0))
+                self.jump_log.append(timestamp, entry.get('JumpDist', 0))
+        except (KeyError, ValueError):
+            pass
+
+    def _divert(self, entry: dict[str, Any]) -> None:
+        self.summary = 'NavRoute: Diverted From Route!'
+        self.diverted = True
+        self.divert_text = divert_text(self.route, self.formatter, entry['StarPos'])
+        self._show_divert()
+        if self.settings and self.settings.use_reroute and self.max_jump_range:
+            self.rerouter.request(
+                entry['StarSystem'], entry['StarPos'], self.current_system_class, self.route,
+                self.max_jump_range, self.settings.reroute_boosts, self.overcharge_boost,
+                lambda request_id, path: self.submit('reroute', request_id, path)
+            )
+
+    def _show_divert(self, reroute: str = '') -> None:
+        text = self.divert_text + reroute
+        self.display = text
+        if self._overlay_ready():
+            self.overlay.display('navroute_display', text.replace('\n', ' '), self.settings.overlay_x,
+                                 self.settings.overlay_y, self.settings.overlay_color)
+
+    def _show_reroute(self, request_id: int, path: list[dict[str, Any]] | None) -> None:
+        """
+        Display the result of a background reroute search. Results from superseded searches are ignored.
+
+        :param request_id: ID of the reroute request
+        :param path: Systems from the current position to the route, or None if no path was found
+        """
+
+        if not self.rerouter.current(request_id) or not path or not self.diverted:
+            return
+        jumps = len(path) - 1
+        reroute = f'\nReroute: {jumps} Jump{plural(jumps)} to {path[-1]["StarSystem"]}'
+        if jumps > 1:
+            reroute += f' via {path[1]["StarSystem"]}'
+        self._show_divert(reroute)
+
+    def _dashboard_entry(self, entry: dict[str, Any]) -> None:
+        old_status = self.status
+        self.status = StatusFlags(entry['Flags'])
+        self.status2 = StatusFlags2(0)
+        if 'Flags2' in entry:
+            self.status2 = StatusFlags2(entry['Flags2'])
+
+        if 'Fuel' in entry:
+            self.fuel_level = entry['Fuel'].get('FuelMain', self.fuel_level)
+        if entry.get('Cargo', self.cargo) != self.cargo:
+            self.cargo = entry['Cargo']
+            self._refresh_fuel()
+
+        # Land first, the update that ends the jump may already carry the next destination
+        jumping = StatusFlags.FSD_JUMP_IN_PROGRESS in self.status
+        if StatusFlags.FSD_JUMP_IN_PROGRESS in old_status and not jumping:
+            self._land_jump()
+        self._track_destination(entry.get('Destination'))
+        if jumping or StatusFlags.FSD_CHARGING in self.status:
+            self._prepare_jump()
+        else:
+            self.hyperspace_jump = False
+            self.pending_jump = None
+
+        if self.can_display_overlay(old_status) != self.can_display_overlay():
+            self._process_jumps()
+
+    def _track_destination(self, destination: dict[str, Any] | None) -> None:
+        """
+        Follow the targeted system from the Status.json Destination block, which updates ahead of the FSDTarget
+        journal event. Targets further along the route move the next jump.
+
+        :param destination: The Status.json Destination data
+        """
+
+        self.destination_index = None
+        if not destination or not self.route or self.diverted:
+            return
+        index = self.route.address_index(destination.get('System'))
+        position = len(self.route) - 1 - max(0, min(self.remaining_jumps, len(self.route) - 1))
+        if index is None or index <= position:
+            return
+        self.destination_index = index
+        if len(self.route) - index != self.remaining_jumps:
+            self.remaining_jumps = len(self.route) - index
+            self.pending_jump = None
+            self._process_jumps()
+
+    def _prepare_jump(self) -> None:
+        """
+        Render the display for arriving at the targeted route system while the FSD charges or the jump is in
+        progress. Only hyperspace jumps, as announced by StartJump, are prepared. The jump to the destination is left
+        to the journal, as it completes the route.
+        """
+
+        if not self.hyperspace_jump or self.pending_jump or self.diverted or not self.settings:
+            return
+        index = self.destination_index
+        if index is None or index != len(self.route) - self.remaining_jumps or index >= len(self.route) - 1:
+            return
+        nav = self.route[index]
+        self.pending_jump = (self.route.systems, index) + render_route(
+            self.route, self.formatter, self.settings.templates, nav['StarSystem'], nav['StarClass'],
+            self.remaining_jumps - 1, self.settings.jump_num, self.overcharge_boost, self.jump_stats,
+            self._current_fuel_table()
+        )
+
+    def _land_jump(self) -> None:
+        """
+        Switch to the pre-rendered display as soon as the jump lands. The FSDJump journal event confirms it later.
+        """
+
+        pending, self.pending_jump = self.pending_jump, None
+        self.hyperspace_jump = False
+        if pending is None or self.diverted or pending[0] is not self.route.systems:
+            return
+        _, index, self.summary, self.display, overlay_text = pending
+        self.current_system = self.route[index]['StarSystem']
+        self.current_system_class = self.route[index]['StarClass']
+        self.remaining_jumps = len(self.route) - 1 - index
+        if self._overlay_ready():
+            self.overlay.display('navroute_display', overlay_text, self.settings.overlay_x, self.settings.overlay_y,
+                                 self.settings.overlay_color, self.settings.overlay_size.lower())
+
+    def _refresh_fuel(self) -> None:
+        """
+        Drop the fuel table after a loadout, fuel or cargo change. It's rebuilt on the next route display.
+        """
+
+        self.fuel_table = None
+        if self.route and not self.diverted:
+            self._process_jumps()
+
+    def _current_fuel_table(self) -> FuelTable | None:
+        """
+        :return: Fuel table for the current route, or None if the drive or ship mass isn't known
+        """
+
+        if self.fsd is None or not self.unladen_mass or not self.route:
+            return None
+        if self.fuel_table is None or self.fuel_table.systems is not self.route.systems:
+            fuel = self.fuel_capacity if self.fuel_level is None else min(self.fuel_level, self.fuel_capacity)
+            start = len(self.route) - 1 - max(0, min(self.remaining_jumps, len(self.route) - 1))
+            self.fuel_table = FuelTable(self.route, self.fsd, self.unladen_mass, self.fuel_capacity, fuel,
+                                        self.cargo, start)
+        return self.fuel_table
+
+    def _process_jumps(self) -> None:
+        if not self.settings:
+            return
+        self.diverted = False
+        if not self.route:
+            self.summary = 'NavRoute: No NavRoute Set'
+            self.display = 'Plot a Route to Begin'
+
+            if self._overlay_ready():
+                self.overlay.clear('navroute_display')
+            return
+
+        self.summary, self.display, overlay_text = render_route(
+            self.route, self.formatter, self.settings.templates, self.current_system, self.current_system_class,
+            self.remaining_jumps, self.settings.jump_num, self.overcharge_boost, self.jump_stats,
+            self._current_fuel_table()
+        )
+
+        if self.overlay.available():
+            if self.can_display_overlay():
+                self.overlay.display('navroute_display', overlay_text, self.settings.overlay_x,
+                                     self.settings.overlay_y, self.settings.overlay_color,
+                                     self.settings.overlay_size.lower())
+            else:
+                self.overlay.clear('navroute_display')
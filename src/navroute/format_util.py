@@ -131,3 +131,22 @@ class Formatter:
         """
 
         return self.format_unit(distance, unit, space, False)
+
+    def format_duration(self, seconds: float) -> str:
+        """
+        Duration formatter.
+
+        :param seconds: Duration in seconds
+        :return: Formatted duration string in days, hours and minutes
+        """
+
+        minutes = round(seconds / 60)
+        if minutes < 1:
+            return '<1m'
+        days, minutes = divmod(minutes, 1440)
+        hours, minutes = divmod(minutes, 60)
+        if days:
+            return f'{days}d {hours}h'
+        if hours:
+            return f'{hours}h {minutes:02d}m'
+        return f'{minutes}m'
@@ -0,0 +1,141 @@
+import re
+from typing import Any, NamedTuple
+
+from navroute.route import Route
+
+# Frame Shift Drive class: rating: (optimal mass, maximum fuel per jump)
+FSD_STATS = {
+    2: {'E': (48, 0.6), 'D': (54, 0.6), 'C': (60, 0.6), 'B': (75, 0.8), 'A': (90, 0.9)},
+    3: {'E': (80, 1.2), 'D': (90, 1.2), 'C': (100, 1.2), 'B': (125, 1.5), 'A': (150, 1.8)},
+    4: {'E': (280, 2.0), 'D': (315, 2.0), 'C': (350, 2.0), 'B': (438, 2.5), 'A': (525, 3.0)},
+    5: {'E': (560, 3.3), 'D': (630, 3.3), 'C': (700, 3.3), 'B': (875, 4.1), 'A': (1050, 5.0)},
+    6: {'E': (960, 5.3), 'D': (1080, 5.3), 'C': (1200, 5.3), 'B': (1500, 6.6), 'A': (1800, 8.0)},
+    7: {'E': (1440, 8.5), 'D': (1620, 8.5), 'C': (1800, 8.5), 'B': (2250, 10.6), 'A': (2700, 12.8)},
+}
+FUEL_MULTIPLIER = {'A': 0.012, 'B': 0.010, 'C': 0.008, 'D': 0.010, 'E': 0.011}
+POWER_CONSTANT = {2: 2.00, 3: 2.15, 4: 2.30, 5: 2.45, 6: 2.60, 7: 2.75}
+RATINGS = {1: 'E', 2: 'D', 3: 'C', 4: 'B', 5: 'A'}
+GUARDIAN_BOOST = {1: 4.0, 2: 6.0, 3: 7.75, 4: 9.25, 5: 10.5}  # Guardian FSD Booster class: added jump range (ly)
+
+SCOOPABLE = frozenset({'K', 'G', 'B', 'F', 'O', 'A', 'M'})
+
+
+class FrameShiftDrive(NamedTuple):
+    """
+    Jump characteristics of a Frame Shift Drive.
+    """
+
+    optimal_mass: float
+    max_fuel: float
+    fuel_multiplier: float
+    power: float
+    boost: float = 0  # Range added by a Guardian FSD Booster
+
+    def fuel_cost(self, distance: float, mass: float) -> float:
+        """
+        :param distance: Jump distance in light years
+        :param mass: Ship mass in tons
+        :return: Fuel used by the jump in tons
+        """
+
+        if self.boost:
+            base_range = self.base_range(mass)
+            distance *= base_range / (base_range + self.boost)
+        return self.fuel_multiplier * (distance * mass / self.optimal_mass) ** self.power
+
+    def base_range(self, mass: float) -> float:
+        """
+        :param mass: Ship mass in tons
+        :return: Longest jump of the drive alone in light years
+        """
+
+        return self.optimal_mass / mass * (self.max_fuel / self.fuel_multiplier) ** (1 / self.power)
+
+    def max_range(self, mass: float) -> float:
+        """
+        :param mass: Ship mass in tons
+        :return: Longest jump without a supercharge in light years
+        """
+
+        return self.base_range(mass) + self.boost
+
+
+def parse_fsd(module: dict[str, Any] | None, modules: list[dict[str, Any]] | None = None) -> FrameShiftDrive | None:
+    """
+    Derive the drive characteristics from a Loadout module entry. Engineered optimal mass and fuel per jump are
+    applied, as is the range of a fitted Guardian FSD Booster. Only the standard drives in the class and rating tables
+    are supported, SCO drives use different values.
+
+    :param module: The FrameShiftDrive entry of the ship modules
+    :param modules: All modules from the Loadout event, used to find a Guardian FSD Booster
+    :return: Drive characteristics or None if unsupported
+    """
+
+    if not module:
+        return None
+    item = module.get('Item', '').lower()
+    match = re.fullmatch(r'int_hyperdrive_size(\d)_class(\d)', item)
+    if not match:
+        return None
+    size, rating = int(match.group(1)), RATINGS.get(int(match.group(2)))
+    if size not in FSD_STATS or rating is None:
+        return None
+    optimal_mass, max_fuel = FSD_STATS[size][rating]
+    for modifier in module.get('Engineering', {}).get('Modifiers', []):
+        match modifier.get('Label'):
+            case 'FSDOptimalMass':
+                optimal_mass = modifier['Value']
+            case 'MaxFuelPerJump':
+                max_fuel = modifier['Value']
+    boost = 0
+    for fitted in modules or []:
+        booster = re.fullmatch(r'int_guardianfsdbooster_size(\d)', fitted.get('Item', '').lower())
+        if booster:
+            boost = GUARDIAN_BOOST.get(int(booster.group(1)), 0)
+    return FrameShiftDrive(optimal_mass, max_fuel, FUEL_MULTIPLIER[rating], POWER_CONSTANT[size], boost)
+
+
+class FuelTable:
+    """
+    Per-leg fuel costs and feasibility for a route, computed in a single pass over the route. Display code only does
+    index lookups.
+    """
+
+    def __init__(self, route: Route, fsd: FrameShiftDrive, unladen_mass: float, tank: float, fuel: float,
+                 cargo: float, start: int):
+        """
+        :param route: The active route
+        :param fsd: Drive characteristics
+        :param unladen_mass: Ship mass without fuel or cargo
+        :param tank: Main fuel tank capacity
+        :param fuel: Current fuel in the main tank
+        :param cargo: Current cargo mass
+        :param start: Route index of the current system
+        """
+
+        self.systems: list[dict[str, Any]] = route.systems
+        mass = unladen_mass + fuel + cargo
+        max_range = fsd.max_range(mass)
+        legs = [route.leg(i) for i in range(len(route))]
+        self.costs: list[float] = [fsd.fuel_cost(distance, mass) for distance in legs]
+        self.unreachable: list[bool] = [distance > max_range for distance in legs]
+        self.dry: list[bool] = [False] * len(legs)
+        for i in range(start + 1, len(legs)):
+            fuel -= self.costs[i]
+            if fuel < 0:
+                self.dry[i] = True
+                fuel = 0
+            if route[i]['StarClass'] in SCOOPABLE:
+                fuel = tank
+
+    def warning(self, index: int) -> str:
+        """
+        :param index: Route index of a system
+        :return: Warning text for the jump into the system, or an empty string
+        """
+
+        if self.unreachable[index]:
+            return ' !range'
+        if self.dry[index]:
+            return ' !fuel'
+        return ''
@@ -0,0 +1,230 @@
+import json
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from os import listdir, replace, stat
+from os.path import join
+from typing import Any, Callable
+
+from EDMCLogging import get_plugin_logger
+from navroute import const
+from navroute.format_util import Formatter
+from navroute.jump_log import SESSION_GAP, parse_timestamp
+from navroute.route import get_distance
+
+logger = get_plugin_logger(const.name)
+
+CACHE_VERSION = 2
+
+STAT_KEYS = ('routes_plotted', 'routes_completed', 'jumps', 'distance', 'diversions', 'efficiency_total',
+             'efficiency_count', 'flown_efficiency_total', 'flown_efficiency_count', 'travel_seconds')
+
+
+def empty_stats() -> dict[str, float]:
+    return {key: 0 for key in STAT_KEYS}
+
+
+def scan_journal(path: str) -> dict[str, float]:
+    """
+    Collect route statistics from a single journal file.
+
+    Routes follow the same rules as the live plugin: a NavRoute event starts a route, NavRouteClear abandons it, and an
+    FSDJump to the destination completes it. The destination is taken from the event's Route list if present,
+    otherwise from an FSDTarget with one jump remaining. Jumps to a system other than the targeted one count as a
+    diversion. Routes are tracked per file, so a route that spans game sessions is counted as plotted only.
+
+    Efficiency matches the plugin display: the straight-line distance of the plotted route divided by the sum of its
+    legs. It is only known for completed routes whose NavRoute event includes the Route list. Flown efficiency is a
+    separate measure for every completed route: the straight-line distance from the plot origin to the destination
+    divided by the distance actually flown, including diversions.
+
+    :param path: Path to the journal file
+    :return: Dictionary of statistics, see STAT_KEYS
+    """
+
+    stats = empty_stats()
+    position = None
+    origin = None
+    flown = 0.0
+    plotted_efficiency = None
+    route: list[dict[str, Any]] | None = None
+    active = False
+    diverted = False
+    target = None
+    remaining = 0
+    last_jump = None
+
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            match entry.get('event'):
+                case 'Location' | 'CarrierJump':
+                    position = entry.get('StarPos', position)
+                case 'NavRoute':
+                    stats['routes_plotted'] += 1
+                    active = True
+                    diverted = False
+                    origin = position
+                    flown = 0.0
+                    route = entry.get('Route') or None
+                    plotted_efficiency = None
+                    if route:
+                        total = sum(get_distance(route[i - 1]['StarPos'], route[i]['StarPos'])
+                                    for i in range(1, len(route)))
+                        if total:
+                            plotted_efficiency = get_distance(route[0]['StarPos'], route[-1]['StarPos']) / total
+                    target = None
+                case 'NavRouteClear':
+                    active = False
+                    route = None
+                case 'FSDTarget':
+                    target = entry.get('Name')
+                    remaining = entry.get('RemainingJumpsInRoute', 0)
+                case 'FSDJump':
+                    system = entry.get('StarSystem')
+                    distance = entry.get('JumpDist', 0)
+                    position = entry.get('StarPos', position)
+                    stats['jumps'] += 1
+                    stats['distance'] += distance
+                    try:
+                        timestamp = parse_timestamp(entry['timestamp'])
+                        if last_jump is not None and 0 < timestamp - last_jump < SESSION_GAP:
+                            stats['travel_seconds'] += timestamp - last_jump
+                        last_jump = timestamp
+                    except (KeyError, ValueError):
+                        pass
+
+                    if not active:
+                        continue
+                    flown += distance
+                    if route:
+                        on_route = any(nav['StarSystem'] == system for nav in route)
+                        complete = system == route[-1]['StarSystem']
+                    else:
+                        on_route = target is None or system == target
+                        complete = system == target and remaining == 1
+                    if complete:
+                        stats['routes_completed'] += 1
+                        if plotted_efficiency is not None:
+                            stats['efficiency_total'] += plotted_efficiency
+                            stats['efficiency_count'] += 1
+                        if origin is not None and flown > 0:
+                            stats['flown_efficiency_total'] += get_distance(origin, position) / flown
+                            stats['flown_efficiency_count'] += 1
+                        active = False
+                        route = None
+                    elif not on_route and not diverted:
+                        stats['diversions'] += 1
+                        diverted = True
+                    elif on_route:
+                        diverted = False
+                    target = None
+    return stats
+
+
+class HistoryScanner:
+    """
+    Scans the journal archive for lifetime route statistics on a background thread.
+
+    Journals are parsed in a process pool, and per-file results are cached by file size and modification time so
+    only new or changed journals are parsed on later runs. Workers are spawned rather than forked, as forking the
+    multi-threaded EDMC process can deadlock. Frozen EDMC builds can't spawn worker processes safely, so there the
+    journals are parsed on the background thread instead.
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path: str = cache_path
+        self._thread: threading.Thread | None = None
+
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, journal_dir: str, callback: Callable[[dict[str, float] | None], None]) -> bool:
+        """
+        Start a scan unless one is already running.
+
+        :param journal_dir: Journal directory
+        :param callback: Called from the worker thread with the combined statistics, or None on failure
+        :return: True if a scan was started
+        """
+
+        if self.running():
+            return False
+        self._thread = threading.Thread(target=self._scan, args=(journal_dir, callback),
+                                        name='NavRoute history', daemon=True)
+        self._thread.start()
+        return True
+
+    def _scan(self, journal_dir: str, callback: Callable[[dict[str, float] | None], None]) -> None:
+        try:
+            cache = self._load_cache()
+            files: dict[str, tuple[int, float]] = {}
+            for name in listdir(journal_dir):
+                if name.startswith('Journal.') and name.endswith('.log'):
+                    info = stat(join(journal_dir, name))
+                    files[name] = (info.st_size, info.st_mtime)
+
+            pending = [name for name, (size, mtime) in files.items()
+                       if name not in cache or cache[name]['size'] != size or cache[name]['mtime'] != mtime]
+            paths = [join(journal_dir, name) for name in pending]
+            if paths:
+                logger.debug(f'Scanning {len(paths)} journal files for route history')
+                if getattr(sys, 'frozen', False):
+                    results = list(map(scan_journal, paths))
+                else:
+                    with ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn')) as executor:
+                        results = list(executor.map(scan_journal, paths, chunksize=16))
+                for name, result in zip(pending, results):
+                    cache[name] = {'size': files[name][0], 'mtime': files[name][1], 'stats': result}
+                self._save_cache(cache)
+
+            totals = empty_stats()
+            for name in files:
+                for key in STAT_KEYS:
+                    totals[key] += cache[name]['stats'].get(key, 0)
+            callback(totals)
+        except Exception as ex:
+            logger.exception('Failed to scan journal history', exc_info=ex)
+            callback(None)
+
+    def _load_cache(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                return data['files']
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return {}
+
+    def _save_cache(self, cache: dict[str, dict[str, Any]]) -> None:
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'files': cache}, f)
+        replace(temp_path, self.cache_path)
+
+
+def format_history(stats: dict[str, float], formatter: Formatter) -> str:
+    """
+    Format combined history statistics for display.
+
+    :param stats: Statistics from HistoryScanner
+    :param formatter: Number formatter
+    :return: Multi-line display text
+    """
+
+    efficiency = (stats['efficiency_total'] / stats['efficiency_count'] * 100) if stats['efficiency_count'] else 0
+    flown_efficiency = (stats['flown_efficiency_total'] / stats['flown_efficiency_count'] * 100) \
+        if stats['flown_efficiency_count'] else 0
+    hours = stats['travel_seconds'] / 3600
+    rate = stats['jumps'] / hours if hours else 0
+    return (f'Routes: {int(stats["routes_plotted"])} plotted, {int(stats["routes_completed"])} completed, '
+            f'{int(stats["diversions"])} diversions\n'
+            f'{int(stats["jumps"])} jumps, {formatter.format_distance(stats["distance"], "ly", False)}, '
+            f'{rate:.1f} jumps/hour\n'
+            f'Average efficiency: {efficiency:.1f}% plotted, {flown_efficiency:.1f}% flown')
@@ -0,0 +1,125 @@
+import mmap
+import struct
+from datetime import datetime
+from os.path import exists, getsize
+
+from EDMCLogging import get_plugin_logger
+from navroute import const
+
+logger = get_plugin_logger(const.name)
+
+HEADER = struct.Struct('<4sI')
+RECORD = struct.Struct('<dd')  # Jump timestamp (epoch seconds), jump distance (ly)
+MAGIC = b'NRJL'
+LOG_VERSION = 1
+
+SESSION_GAP = 1800  # Gaps between jumps longer than this many seconds start a new session
+REPLAY_RECORDS = 256  # Enough history for the averages to settle, older records have negligible weight
+
+
+def parse_timestamp(timestamp: str) -> float:
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+
+
+class JumpStats:
+    """
+    Exponentially weighted jump statistics. Each update is O(1) and only the running averages are kept in memory.
+    Gaps longer than SESSION_GAP are ignored, so breaks between play sessions don't skew the jump rate.
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha: float = alpha
+        self.last_timestamp: float = 0
+        self.interval: float | None = None  # Average seconds between jumps
+        self.distance: float | None = None  # Average jump distance
+
+    def update(self, timestamp: float, distance: float) -> None:
+        if self.last_timestamp and 0 < timestamp - self.last_timestamp < SESSION_GAP:
+            interval = timestamp - self.last_timestamp
+            self.interval = interval if self.interval is None else \
+                self.interval + self.alpha * (interval - self.interval)
+        self.distance = distance if self.distance is None else \
+            self.distance + self.alpha * (distance - self.distance)
+        self.last_timestamp = timestamp
+
+    def jumps_per_hour(self) -> float | None:
+        return 3600 / self.interval if self.interval else None
+
+    def ly_per_hour(self) -> float | None:
+        return 3600 * self.distance / self.interval if self.interval and self.distance is not None else None
+
+    def eta(self, remaining_jumps: int) -> float | None:
+        """
+        :param remaining_jumps: Number of jumps left
+        :return: Estimated seconds to complete the jumps, or None if there is no jump rate yet
+        """
+
+        return remaining_jumps * self.interval if self.interval else None
+
+
+class JumpLog:
+    """
+    Append-only binary log of FSD jumps with fixed-size records, stored in the plugin data directory.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self.last_timestamp: float = 0
+        self._prepare()
+
+    def _prepare(self) -> None:
+        """
+        Create the log if needed. A damaged or incompatible log is started over, and a partially written trailing
+        record is dropped so new records stay aligned.
+        """
+
+        try:
+            if exists(self.path) and getsize(self.path) >= HEADER.size:
+                with open(self.path, 'r+b') as f:
+                    magic, version = HEADER.unpack(f.read(HEADER.size))
+                    if magic == MAGIC and version == LOG_VERSION:
+                        size = getsize(self.path)
+                        f.truncate(size - (size - HEADER.size) % RECORD.size)
+                        return
+                logger.warning('Jump log is not compatible, starting a new log')
+            with open(self.path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, LOG_VERSION))
+        except OSError as ex:
+            logger.error('Could not prepare the jump log', exc_info=ex)
+
+    def append(self, timestamp: float, distance: float) -> None:
+        """
+        Record a jump. Jumps at or before the last recorded jump are ignored.
+
+        :param timestamp: Jump timestamp in epoch seconds
+        :param distance: Jump distance in light years
+        """
+
+        if timestamp <= self.last_timestamp:
+            return
+        try:
+            with open(self.path, 'ab') as f:
+                f.write(RECORD.pack(timestamp, distance))
+            self.last_timestamp = timestamp
+        except OSError as ex:
+            logger.error('Could not write to the jump log', exc_info=ex)
+
+    def replay(self, stats: JumpStats, count: int = REPLAY_RECORDS) -> None:
+        """
+        Feed the most recent records into a JumpStats instance. Only the tail of the log is read.
+
+        :param stats: Statistics to update
+        :param count: Maximum number of records to read
+        """
+
+        try:
+            if getsize(self.path) <= HEADER.size:
+                return
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                records = (len(data) - HEADER.size) // RECORD.size
+                for i in range(max(records - count, 0), records):
+                    timestamp, distance = RECORD.unpack_from(data, HEADER.size + i * RECORD.size)
+                    stats.update(timestamp, distance)
+                    self.last_timestamp = timestamp
+        except (OSError, ValueError) as ex:
+            logger.error('Could not read the jump log', exc_info=ex)
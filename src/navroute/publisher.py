@@ -0,0 +1,168 @@
+import json
+import queue
+import socket
+import threading
+from typing import Any
+
+from EDMCLogging import get_plugin_logger
+from navroute import const
+
+logger = get_plugin_logger(const.name)
+
+SCHEMA_VERSION = 1
+
+
+class Subscriber:
+    """
+    A connected client. Messages are sent from a dedicated thread through a bounded queue so a slow client never
+    blocks the publisher. A client that falls behind has its backlog dropped and is resynced with a full snapshot.
+    """
+
+    def __init__(self, publisher: 'RoutePublisher', connection: socket.socket, max_backlog: int = 32):
+        self.connection: socket.socket = connection
+        self.messages: queue.Queue[bytes | None] = queue.Queue(max_backlog)
+        self._publisher = publisher
+        self._thread = threading.Thread(target=self._send_loop, name='NavRoute subscriber', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def send(self, message: bytes) -> None:
+        try:
+            self.messages.put_nowait(message)
+        except queue.Full:
+            self.resync()
+
+    def resync(self) -> None:
+        while True:
+            try:
+                self.messages.get_nowait()
+            except queue.Empty:
+                break
+        self.messages.put_nowait(self._publisher.snapshot_message())
+
+    def close(self) -> None:
+        try:
+            self.messages.put_nowait(None)
+        except queue.Full:
+            pass
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _send_loop(self) -> None:
+        try:
+            while True:
+                message = self.messages.get()
+                if message is None:
+                    break
+                self.connection.sendall(message)
+        except OSError:
+            pass
+        finally:
+            self.connection.close()
+            self._publisher.remove(self)
+
+
+class RoutePublisher:
+    """
+    Publishes route state to local clients as newline-delimited JSON over a localhost TCP socket.
+
+    Each client receives a full 'snapshot' message when it connects, followed by 'delta' messages holding only the
+    fields that changed. Every message carries the schema version and a state version which increases by one for each
+    change, so clients can detect gaps and reconnect for a fresh snapshot.
+    """
+
+    def __init__(self, port: int):
+        self.port: int = port
+        self._state: dict[str, Any] = {}
+        self._version: int = 0
+        self._lock = threading.Lock()
+        self._subscribers: list[Subscriber] = []
+        self._server: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._server:
+            return
+        try:
+            self._server = socket.create_server(('127.0.0.1', self.port))
+        except OSError as ex:
+            logger.error(f'Could not open route publisher port {self.port}', exc_info=ex)
+            self._server = None
+            return
+        self._thread = threading.Thread(target=self._accept_loop, args=(self._server,),
+                                        name='NavRoute publisher', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server:
+            # Closing alone doesn't wake a blocked accept() on Linux, which would keep the port bound
+            try:
+                self._server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._server.close()
+            self._server = None
+        if self._thread:
+            self._thread.join(1)
+            self._thread = None
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscriber in subscribers:
+            subscriber.close()
+
+    def running(self) -> bool:
+        return self._server is not None
+
+    def publish(self, state: dict[str, Any]) -> None:
+        """
+        Update the published state. Only changed fields are sent and nothing is sent if the state is unchanged.
+
+        :param state: The full current route state
+        """
+
+        with self._lock:
+            delta = {key: value for key, value in state.items()
+                     if key not in self._state or self._state[key] != value}
+            if not delta:
+                return
+            self._state = dict(state)
+            self._version += 1
+            if not self._subscribers:
+                return
+            message = self._encode('delta', delta)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.send(message)
+
+    def snapshot_message(self) -> bytes:
+        with self._lock:
+            return self._encode('snapshot', self._state)
+
+    def remove(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def _encode(self, message_type: str, state: dict[str, Any]) -> bytes:
+        return (json.dumps({
+            'type': message_type,
+            'schema': SCHEMA_VERSION,
+            'version': self._version,
+            'state': state
+        }) + '\n').encode('utf-8')
+
+    def _accept_loop(self, server: socket.socket) -> None:
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                break
+            subscriber = Subscriber(self, connection)
+            with self._lock:
+                subscriber.messages.put_nowait(self._encode('snapshot', self._state))
+                self._subscribers.append(subscriber)
+            subscriber.start()
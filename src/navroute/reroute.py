@@ -0,0 +1,324 @@
+import csv
+import heapq
+import math
+import threading
+import time
+from os.path import exists
+from typing import Any, Callable
+
+from EDMCLogging import get_plugin_logger
+from navroute import const
+from navroute.route import Route, get_distance
+
+logger = get_plugin_logger(const.name)
+
+
+def boost_factor(star_class: str | None, overcharge: bool = False) -> float:
+    """
+    FSD range multiplier for supercharging at a star. Matches the factors shown by star_display.
+
+    :param star_class: The journal StarClass value
+    :param overcharge: Whether the Mk II FSD boost values apply
+    :return: Jump range multiplier
+    """
+
+    if star_class == 'N':
+        return 6 if overcharge else 4
+    if star_class and star_class.startswith('D'):
+        return 3 if overcharge else 1.5
+    return 1
+
+
+def grid_cell(position: tuple[float, float, float], cell_size: float) -> tuple[int, int, int]:
+    return (math.floor(position[0] / cell_size), math.floor(position[1] / cell_size),
+            math.floor(position[2] / cell_size))
+
+
+class StarCatalog:
+    """
+    Offline star catalog with a uniform grid index for radius queries.
+
+    The catalog is a CSV file with one system per row: name, x, y, z and star class.
+    """
+
+    def __init__(self, cell_size: float = 50):
+        self.cell_size: float = cell_size
+        self.names: list[str] = []
+        self.positions: list[tuple[float, float, float]] = []
+        self.classes: list[str | None] = []
+        self._grid: dict[tuple[int, int, int], list[int]] = {}
+        self._lookup: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str, position: tuple[float, float, float], star_class: str | None) -> int:
+        """
+        Add a system to the catalog. Systems that are already known are not duplicated.
+
+        :param name: System name
+        :param position: StarPos coordinates
+        :param star_class: Primary star class
+        :return: Catalog index of the system
+        """
+
+        if name in self._lookup:
+            return self._lookup[name]
+        index = len(self.names)
+        self.names.append(name)
+        self.positions.append((position[0], position[1], position[2]))
+        self.classes.append(star_class)
+        self._lookup[name] = index
+        self._grid.setdefault(self._cell(position), []).append(index)
+        return index
+
+    def index(self, name: str) -> int | None:
+        return self._lookup.get(name)
+
+    def load(self, path: str) -> None:
+        """
+        Read systems from a catalog CSV file. Malformed rows are skipped.
+
+        :param path: Path to the catalog file
+        """
+
+        if not exists(path):
+            return
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                try:
+                    position = (float(row[1]), float(row[2]), float(row[3]))
+                except (IndexError, ValueError):
+                    continue
+                self.add(row[0], position, row[4] if len(row) > 4 and row[4] else None)
+        logger.debug(f'Loaded {len(self)} systems from star catalog')
+
+    def neighbours(self, position: tuple[float, float, float], radius: float) -> list[int]:
+        """
+        Find all catalog systems within a radius of a position.
+
+        :param position: Center coordinates
+        :param radius: Search radius in light years
+        :return: List of catalog indices
+        """
+
+        cx, cy, cz = self._cell(position)
+        span = math.ceil(radius / self.cell_size)
+        radius_sq = radius * radius
+        result = []
+        for x in range(cx - span, cx + span + 1):
+            for y in range(cy - span, cy + span + 1):
+                for z in range(cz - span, cz + span + 1):
+                    for index in self._grid.get((x, y, z), ()):
+                        other = self.positions[index]
+                        if ((other[0] - position[0]) ** 2 + (other[1] - position[1]) ** 2
+                                + (other[2] - position[2]) ** 2) <= radius_sq:
+                            result.append(index)
+        return result
+
+    def _cell(self, position: tuple[float, float, float]) -> tuple[int, int, int]:
+        return grid_cell(position, self.cell_size)
+
+
+class GoalIndex:
+    """
+    Uniform grid over the route waypoints for nearest-waypoint distance queries. Grid cells are searched in rings
+    around the query position until no unsearched cell can hold a closer waypoint. When that would mean searching more
+    cells than there are waypoints, the waypoints are checked directly instead.
+    """
+
+    def __init__(self, positions: list[tuple[float, float, float]], cell_size: float):
+        self.cell_size: float = cell_size
+        self.positions: list[tuple[float, float, float]] = positions
+        self._grid: dict[tuple[int, int, int], list[tuple[float, float, float]]] = {}
+        for position in positions:
+            self._grid.setdefault(grid_cell(position, cell_size), []).append(position)
+
+    def nearest_distance(self, position: tuple[float, float, float]) -> float:
+        """
+        :param position: Query coordinates
+        :return: Distance to the closest waypoint
+        """
+
+        cx, cy, cz = grid_cell(position, self.cell_size)
+        best = math.inf
+        ring = 0
+        searched = 0
+        while searched < len(self.positions):
+            for x in range(cx - ring, cx + ring + 1):
+                for y in range(cy - ring, cy + ring + 1):
+                    edge = ring in (abs(x - cx), abs(y - cy))
+                    for z in ((cz - ring, cz + ring) if not edge and ring else range(cz - ring, cz + ring + 1)):
+                        for other in self._grid.get((x, y, z), ()):
+                            best = min(best, get_distance(position, other))
+            searched += (2 * ring + 1) ** 3 - (2 * ring - 1) ** 3 if ring else 1
+            # Waypoints in the following rings are at least this far away
+            if best <= ring * self.cell_size:
+                return best
+            ring += 1
+        return min(get_distance(position, other) for other in self.positions)
+
+
+def find_reroute(catalog: StarCatalog, start: int, goals: dict[int, int], jump_range: float,
+                 use_boosts: bool = False, overcharge: bool = False, deadline: float | None = None,
+                 cancelled: threading.Event | None = None) -> list[int] | None:
+    """
+    A* search for the fewest-jumps path from a system to any route waypoint.
+
+    :param catalog: Star catalog containing the start and goal systems
+    :param start: Catalog index of the starting system
+    :param goals: Mapping of goal catalog indices to their route index, later route positions win ties
+    :param jump_range: Maximum unboosted jump range in light years
+    :param use_boosts: Whether neutron and white dwarf supercharges extend the jump range
+    :param overcharge: Whether the Mk II FSD boost values apply
+    :param deadline: time.monotonic() value after which the search gives up
+    :param cancelled: Event which aborts the search when set
+    :return: List of catalog indices from start to goal, or None if no path was found in time
+    """
+
+    if jump_range <= 0 or not goals:
+        return None
+    max_jump = jump_range * (boost_factor('N', overcharge) if use_boosts else 1)
+    goal_index = GoalIndex([catalog.positions[goal] for goal in goals], max_jump)
+
+    def remaining(index: int) -> float:
+        return goal_index.nearest_distance(catalog.positions[index])
+
+    came_from: dict[int, int] = {}
+    cost: dict[int, int] = {start: 0}
+    distance = remaining(start)
+    queue = [(math.ceil(distance / max_jump), distance, -goals.get(start, -1), 0, start)]
+    expanded = 0
+    while queue:
+        _, _, _, jumps, current = heapq.heappop(queue)
+        if current in goals:
+            path = [current]
+            while path[-1] in came_from:
+                path.append(came_from[path[-1]])
+            return path[::-1]
+        if jumps > cost[current]:
+            continue
+        expanded += 1
+        if expanded % 64 == 0:
+            if (deadline is not None and time.monotonic() > deadline) or (cancelled and cancelled.is_set()):
+                return None
+        reach = jump_range * (boost_factor(catalog.classes[current], overcharge) if use_boosts else 1)
+        for neighbour in catalog.neighbours(catalog.positions[current], reach):
+            new_cost = jumps + 1
+            if new_cost < cost.get(neighbour, new_cost + 1):
+                cost[neighbour] = new_cost
+                came_from[neighbour] = current
+                distance = remaining(neighbour)
+                heapq.heappush(queue, (new_cost + math.ceil(distance / max_jump), distance,
+                                       -goals.get(neighbour, -1), new_cost, neighbour))
+    return None
+
+
+class Rerouter:
+    """
+    Runs reroute searches on a worker thread. Only the latest request is kept, an older search is cancelled when a
+    new one starts and its result is discarded.
+
+    The star catalog is loaded once on its own thread. The search time budget starts once the catalog is loaded.
+    """
+
+    def __init__(self, catalog_path: str, time_budget: float = 2.0):
+        self.catalog_path: str = catalog_path
+        self.time_budget: float = time_budget
+        self._catalog: StarCatalog = StarCatalog()
+        self._loader: threading.Thread | None = None
+        self._loaded: threading.Event = threading.Event()
+        self._lock = threading.Lock()
+        self._search_lock = threading.Lock()
+        self._cancel: threading.Event = threading.Event()
+        self._request: int = 0
+
+    def load(self) -> None:
+        """
+        Start loading the star catalog in the background, unless it has already been started.
+        """
+
+        with self._lock:
+            if self._loader is not None:
+                return
+            self._loader = threading.Thread(target=self._load_catalog, name='NavRoute catalog', daemon=True)
+        self._loader.start()
+
+    def _load_catalog(self) -> None:
+        try:
+            self._catalog.load(self.catalog_path)
+        except Exception as ex:
+            logger.exception('Failed to load the star catalog', exc_info=ex)
+        self._loaded.set()
+
+    def request(self, system: str, position: tuple[float, float, float], star_class: str | None, route: Route,
+                jump_range: float, use_boosts: bool, overcharge: bool,
+                callback: Callable[[int, list[dict[str, Any]] | None], None]) -> int:
+        """
+        Start a reroute search in the background.
+
+        :param system: Current system name
+        :param position: Current StarPos
+        :param star_class: Current primary star class, if known
+        :param route: The active route
+        :param jump_range: Maximum unboosted jump range
+        :param use_boosts: Whether to use neutron and white dwarf supercharges
+        :param overcharge: Whether the Mk II FSD boost values apply
+        :param callback: Called from the worker thread with the request ID and the path as a list of
+                         {StarSystem, StarPos, StarClass} entries, or None if no path was found
+        :return: The request ID
+        """
+
+        with self._lock:
+            self._cancel.set()
+            self._cancel = threading.Event()
+            self._request += 1
+            request_id = self._request
+            cancelled = self._cancel
+        self.load()
+        waypoints = [(nav['StarSystem'], nav['StarPos'], nav['StarClass']) for nav in route.systems]
+        thread = threading.Thread(
+            target=self._search,
+            args=(request_id, cancelled, system, position, star_class, waypoints, jump_range, use_boosts, overcharge,
+                  callback),
+            name='NavRoute reroute',
+            daemon=True
+        )
+        thread.start()
+        return request_id
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancel.set()
+            self._request += 1
+
+    def current(self, request_id: int) -> bool:
+        with self._lock:
+            return request_id == self._request
+
+    def _search(self, request_id: int, cancelled: threading.Event, system: str,
+                position: tuple[float, float, float], star_class: str | None,
+                waypoints: list[tuple[str, Any, str]], jump_range: float, use_boosts: bool, overcharge: bool,
+                callback: Callable[[int, list[dict[str, Any]] | None], None]) -> None:
+        path = None
+        try:
+            while not self._loaded.wait(0.1):
+                if cancelled.is_set():
+                    return
+            with self._search_lock:
+                if cancelled.is_set():
+                    return
+                deadline = time.monotonic() + self.time_budget
+                catalog = self._catalog
+                goals = {}
+                for i, (name, star_pos, waypoint_class) in enumerate(waypoints):
+                    goals[catalog.add(name, star_pos, waypoint_class)] = i
+                start = catalog.add(system, position, star_class)
+                result = find_reroute(catalog, start, goals, jump_range, use_boosts, overcharge, deadline, cancelled)
+                if result is not None:
+                    path = [{'StarSystem': catalog.names[i], 'StarPos': catalog.positions[i],
+                             'StarClass': catalog.classes[i]} for i in result]
+        except Exception as ex:
+            logger.exception('Reroute search failed', exc_info=ex)
+        if not cancelled.is_set():
+            callback(request_id, path)
@@ -0,0 +1,314 @@
+import math
+from typing import Any, TYPE_CHECKING
+
+from navroute.format_util import Formatter
+from navroute.template import DisplayTemplates, Template
+
+if TYPE_CHECKING:
+    from navroute.fuel import FuelTable
+    from navroute.jump_log import JumpStats
+
+
+def get_distance(a: tuple[float, float, float], b: tuple[float, float, float]) -> float:
+    return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
+
+
+def plural(count: int) -> str:
+    return 's'[:count ^ 1]
+
+
+def star_display(star_class: str | None, indicators: bool = True, overcharge: bool = False) -> str:
+    """
+    Star class badge with optional fuel / boost indicators.
+
+    :param star_class: The journal StarClass value
+    :param indicators: Whether to add fuel and boost indicators
+    :param overcharge: Whether the Mk II FSD boost values apply
+    :return: Display string for the star class
+    """
+
+    if star_class is None:
+        return ''
+
+    if indicators:
+        match star_class:
+            case 'M' | 'K' | 'G' | 'F' | 'A' | 'B' | 'O':
+                return f'\N{FUEL PUMP}{star_class}'
+            case 'N':
+                return '\N{HIGH VOLTAGE SIGN}{}N'.format('×6 ' if overcharge else '×4 ')
+
+        if star_class.startswith('D'):
+            return '\N{HIGH VOLTAGE SIGN}{}{}'.format('×3 ' if overcharge else '×1.5 ', star_class)
+
+    return star_class
+
+
+def system_key(nav: dict[str, Any]) -> int | str:
+    return nav.get('SystemAddress', nav['StarSystem'])
+
+
+def _remove_position(lookup: dict[Any, list[int]], key: Any, remaining: int) -> None:
+    positions = lookup.get(key)
+    if positions and remaining in positions:
+        positions.remove(remaining)
+        if not positions:
+            del lookup[key]
+
+
+class Route:
+    """
+    A plotted NavRoute. Leg distances, distances to the destination and the system lookups are computed when the
+    route is loaded so that position searches and display updates don't need to walk the route or recompute distances.
+
+    Per-system data is stored by the number of jumps remaining to the destination. A re-plot to the same destination
+    shares a suffix with the old route, which keeps the same remaining jump counts, so that data is reused as-is and
+    only the changed section of the route is recomputed.
+    """
+
+    def __init__(self, systems: list[dict[str, Any]] | None = None):
+        self.systems: list[dict[str, Any]] = []
+        self.total_distance: float = 0
+        self.straight_distance: float = 0
+        self._source: list[dict[str, Any]] | None = None
+        self._legs: list[float] = []  # Distance of the jump into the system with N remaining jumps
+        self._tails: list[float] = []  # Distance from the system with N remaining jumps to the destination
+        self._names: dict[str, list[int]] = {}  # System name to remaining jumps of each occurrence
+        self._addresses: dict[int | str, list[int]] = {}  # System address to remaining jumps of each occurrence
+        if systems:
+            self.load(systems)
+
+    def __len__(self) -> int:
+        return len(self.systems)
+
+    def __bool__(self) -> bool:
+        return len(self.systems) > 0
+
+    def __getitem__(self, item: int) -> dict[str, Any]:
+        return self.systems[item]
+
+    def load(self, systems: list[dict[str, Any]]) -> None:
+        """
+        Load a new route. Data for the section shared with the currently loaded route is reused.
+
+        :param systems: The 'Route' list from the NavRoute data
+        """
+
+        old_systems = self.systems
+        length = len(systems)
+        old_length = len(old_systems)
+        shared = min(length, old_length)
+
+        suffix = 0
+        while suffix < shared and system_key(systems[-1 - suffix]) == system_key(old_systems[-1 - suffix]):
+            suffix += 1
+        prefix = 0
+        while prefix < shared - suffix and system_key(systems[prefix]) == system_key(old_systems[prefix]):
+            prefix += 1
+
+        prefix_legs = [self._legs[old_length - 1 - i] for i in range(1, prefix)]
+
+        reused = max(suffix - 1, 0)
+
+        # Drop lookups for the recomputed section of the old route. Lookups are kept per position, so occurrences of
+        # the same system in the reused suffix stay in place.
+        for i in range(old_length - reused):
+            remaining = old_length - 1 - i
+            _remove_position(self._names, old_systems[i]['StarSystem'], remaining)
+            _remove_position(self._addresses, system_key(old_systems[i]), remaining)
+
+        del self._legs[reused:]
+        del self._tails[reused:]
+        for remaining in range(reused, length):
+            i = length - 1 - remaining
+            if i == 0:
+                distance = 0.0
+            elif i < prefix:
+                distance = prefix_legs[i - 1]
+            else:
+                distance = get_distance(systems[i]['StarPos'], systems[i - 1]['StarPos'])
+            self._legs.append(distance)
+            self._tails.append(self._tails[remaining - 1] + self._legs[remaining - 1] if remaining else 0.0)
+            self._names.setdefault(systems[i]['StarSystem'], []).append(remaining)
+            self._addresses.setdefault(system_key(systems[i]), []).append(remaining)
+
+        self._source = systems
+        self.systems = systems
+        self.total_distance = self._tails[-1] if self._tails else 0
+        if self.systems:
+            self.straight_distance = get_distance(self.systems[0]['StarPos'], self.systems[-1]['StarPos'])
+        else:
+            self.straight_distance = 0
+
+    def clear(self) -> None:
+        """
+        Clear the route. The last loaded source is kept so a stale copy of the same route isn't reloaded.
+        """
+
+        self.systems = []
+        self._legs = []
+        self._tails = []
+        self._names = {}
+        self._addresses = {}
+        self.total_distance = 0
+        self.straight_distance = 0
+
+    def changed(self, systems: list[dict[str, Any]]) -> bool:
+        """
+        Check whether a route list differs from the last one loaded.
+
+        :param systems: The 'Route' list from the NavRoute data
+        :return: True if the route should be reloaded
+        """
+
+        return systems != self._source
+
+    def index(self, system: str) -> int | None:
+        """
+        Find the first route position of a system.
+
+        :param system: System name
+        :return: Route index or None if the system isn't on the route
+        """
+
+        positions = self._names.get(system)
+        return len(self.systems) - 1 - max(positions) if positions else None
+
+    def address_index(self, address: int) -> int | None:
+        """
+        Find the route position of a system by its SystemAddress.
+
+        :param address: The SystemAddress
+        :return: Route index or None if the system isn't on the route
+        """
+
+        positions = self._addresses.get(address)
+        return len(self.systems) - 1 - max(positions) if positions else None
+
+    def nearest(self, position: tuple[float, float, float]) -> tuple[str, float]:
+        """
+        Find the route system closest to a given position.
+
+        :param position: StarPos coordinates
+        :return: Tuple of the system name and its distance, or ('', -1) for an empty route
+        """
+
+        nearest_system = ('', -1)
+        for nav in self.systems:
+            distance = get_distance(position, nav['StarPos'])
+            if nearest_system[1] == -1 or distance < nearest_system[1]:
+                nearest_system = (nav['StarSystem'], distance)
+        return nearest_system
+
+    def leg(self, index: int) -> float:
+        """
+        :param index: Route index of a system
+        :return: Distance of the jump into the system at the given index
+        """
+
+        return self._legs[len(self.systems) - 1 - index]
+
+    def distance_from(self, index: int) -> float:
+        """
+        :param index: Route index of a system
+        :return: Route distance from the system at the given index to the destination
+        """
+
+        return self._tails[len(self.systems) - 1 - index]
+
+def render_hop(template: Template, formatter: Formatter, system: dict[str, Any], distance: float,
+               indicators: bool, overcharge: bool, warning: str = '') -> str:
+    values = {'system': system['StarSystem'], 'warning': warning}
+    if 'distance' in template.fields:
+        values['distance'] = formatter.format_distance(distance, 'ly', False)
+    if 'star' in template.fields:
+        values['star'] = star_display(system['StarClass'], indicators, overcharge)
+    return template(values)
+
+
+def render_route(route: Route, formatter: Formatter, templates: DisplayTemplates, current_system: str,
+                 current_class: str | None, remaining_jumps: int, jump_num: int,
+                 overcharge: bool, stats: 'JumpStats | None' = None,
+                 fuel: 'FuelTable | None' = None) -> tuple[str, str, str]:
+    """
+    Build the route display text.
+
+    :param route: The active route, must not be empty
+    :param formatter: Number formatter
+    :param templates: Compiled display templates
+    :param current_system: Name of the current system
+    :param current_class: Star class of the current system
+    :param remaining_jumps: Number of jumps remaining in the route
+    :param jump_num: Number of interim jumps to list
+    :param overcharge: Whether the Mk II FSD boost values apply
+    :param stats: Jump rate statistics for the arrival estimate
+    :param fuel: Fuel table for the route, used for the jump range and fuel warnings
+    :return: Tuple of the summary label text, the route label text and the overlay text
+    """
+
+    remaining_jumps = max(0, min(remaining_jumps, len(route) - 1))
+    position = len(route) - 1 - remaining_jumps
+    indicators = templates.show_indicators
+    current_star = star_display(current_class, indicators, overcharge)
+    display = templates.origin({'system': current_system, 'star': current_star})
+    remaining_distance = 0
+
+    for i in range(remaining_jumps):
+        index = position + 1 + i
+        if i >= jump_num:
+            remainder_distance = route.distance_from(index - 1)
+            remaining_distance += remainder_distance
+            display += render_hop(templates.remainder, formatter, route[-1], remainder_distance,
+                                  indicators, overcharge)
+            break
+
+        distance = route.leg(index)
+        remaining_distance += distance
+        warning = fuel.warning(index) if fuel and indicators else ''
+        display += render_hop(templates.hop, formatter, route[index], distance, indicators, overcharge, warning)
+        if i == (jump_num - 1) and i < remaining_jumps - 2:
+            display += f' | +{remaining_jumps - jump_num - 1} Jump{plural(remaining_jumps)}'
+
+    if templates.wrap and len(display) > templates.wrap:
+        display = '\n-> '.join(display.split(' -> '))
+
+    efficiency = route.straight_distance / route.total_distance * 100 if route.total_distance else 100
+    values = {
+        'system': current_system,
+        'star': current_star,
+        'jumps': f'{remaining_jumps} Jump{plural(remaining_jumps)}',
+        'jump_count': str(remaining_jumps),
+        'remaining': formatter.format_distance(remaining_distance, 'ly', False),
+        'total': formatter.format_distance(route.total_distance, 'ly', False),
+        'ratio': (f'{formatter.format_distance(remaining_distance, '', False)}/'
+                  f'{formatter.format_distance(route.total_distance, 'ly', False)}'),
+        'straight': formatter.format_distance(route.straight_distance, 'ly', False),
+        'efficiency': f'{efficiency:.1f}%',
+        'route': display,
+        'eta': '',
+        'rate': '',
+    }
+    if stats:
+        eta = stats.eta(remaining_jumps)
+        if eta is not None:
+            values['eta'] = f', ETA {formatter.format_duration(eta)}'
+            values['rate'] = (f'{stats.jumps_per_hour():.0f} jumps/hr, '
+                              f'{formatter.format_distance(stats.ly_per_hour(), "ly/hr", False)}')
+    summary = templates.label(values)
+    values['route'] = display.replace('\n', ' ')
+    overlay_text = templates.overlay(values)
+    return summary, display, overlay_text
+
+
+def divert_text(route: Route, formatter: Formatter, position: tuple[float, float, float]) -> str:
+    """
+    Build the diverted-from-route display text.
+
+    :param route: The active route
+    :param formatter: Number formatter
+    :param position: StarPos of the current system
+    :return: Display text suggesting the nearest route system
+    """
+
+    nearest_system = route.nearest(position)
+    return (f'Recalculate or Jump\n{nearest_system[0]} to Resume\n'
+            f'({formatter.format_distance(nearest_system[1], 'ly', False)})')
@@ -0,0 +1,75 @@
+import string
+from typing import Callable, Mapping
+
+DEFAULT_LABEL = r'NavRoute ({straight}, {efficiency} efficiency)\n {jumps} Remaining ({ratio}{eta})'
+DEFAULT_OVERLAY = '{jumps} ({ratio}{eta}): {route}'
+DEFAULT_WRAP = 60
+
+SUMMARY_FIELDS = frozenset({
+    'system', 'star', 'jumps', 'jump_count', 'remaining', 'total', 'ratio', 'straight', 'efficiency', 'route', 'eta',
+    'rate'
+})
+HOP_FIELDS = frozenset({'system', 'star', 'distance', 'warning'})
+
+
+class Template:
+    """
+    A display template compiled into a render callable. The template is parsed once, rendering only joins the
+    literal text with the placeholder values.
+    """
+
+    def __init__(self, source: str, allowed: frozenset[str]):
+        self.source: str = source
+        self.fields: frozenset[str] = frozenset()
+        self.render: Callable[[Mapping[str, str]], str] = self._compile(source.replace('\\n', '\n'), allowed)
+
+    def __call__(self, values: Mapping[str, str]) -> str:
+        return self.render(values)
+
+    def _compile(self, source: str, allowed: frozenset[str]) -> Callable[[Mapping[str, str]], str]:
+        parts: list[tuple[str, str | None]] = []
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            if field is not None:
+                if field not in allowed:
+                    raise ValueError(f'Unknown template field "{field}"')
+                if spec or conversion:
+                    raise ValueError(f'Format options are not supported for template field "{field}"')
+            parts.append((literal, field))
+        self.fields = frozenset(field for _, field in parts if field is not None)
+
+        if not self.fields:
+            text = ''.join(literal for literal, _ in parts)
+            return lambda values: text
+        if len(parts) == 1:
+            literal, field = parts[0]
+            return lambda values: literal + values[field]
+        return lambda values: ''.join([literal + values[field] if field is not None else literal
+                                       for literal, field in parts])
+
+
+class DisplayTemplates:
+    """
+    The full set of compiled display templates. Built whenever the display preferences change.
+
+    When no route step template is given, the step layout is derived from the distance and star class settings. Jump
+    range and fuel warnings are added to the derived steps when indicators are enabled.
+    """
+
+    def __init__(self, show_distance: bool = True, show_starclass: bool = True, show_indicators: bool = True,
+                 label: str = DEFAULT_LABEL, overlay: str = DEFAULT_OVERLAY, hop: str = '', wrap: int = DEFAULT_WRAP):
+        self.show_indicators: bool = show_indicators
+        self.wrap: int = wrap
+        self.origin: Template = Template('{system} [{star}]', HOP_FIELDS)
+        warning = '{warning}' if show_indicators else ''
+        if hop:
+            self.hop: Template = Template(hop, HOP_FIELDS)
+            self.remainder: Template = self.hop
+        elif show_starclass:
+            self.hop = Template((' - {distance} -> ' if show_distance else ' -> ') + '{system} [{star}]' + warning,
+                                HOP_FIELDS)
+            self.remainder = self.hop
+        else:
+            self.hop = Template((' - {distance} -> {system}' if show_distance else '{system}') + warning, HOP_FIELDS)
+            self.remainder = Template(' - {distance} -> {system}', HOP_FIELDS)
+        self.label: Template = Template(label, SUMMARY_FIELDS)
+        self.overlay: Template = Template(overlay, SUMMARY_FIELDS)
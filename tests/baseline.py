@@ -0,0 +1,321 @@
+"""
+Reference copy of the route display and journal handling from load.py before the route logic moved to the navroute
+package. The method bodies are unchanged apart from module globals becoming attributes, so the harness can check the
+current implementation against the original output.
+"""
+
+import json
+import logging
+import math
+from os.path import join
+from typing import Any, MutableMapping, Mapping
+
+from navroute.format_util import Formatter
+from navroute.status_flags import StatusFlags2, StatusFlags
+
+
+class Var:
+    """
+    Stand-in for the Tk preference variables.
+    """
+
+    def __init__(self, value: Any):
+        self.value: Any = value
+
+    def get(self) -> Any:
+        return self.value
+
+
+class Overlay:
+    """
+    Records the last overlay text instead of drawing it.
+    """
+
+    def __init__(self):
+        self.text: str | None = None
+
+    def available(self) -> bool:
+        return True
+
+    def display(self, message_id: str, text: str, *args: Any) -> None:
+        self.text = text
+
+    def draw(self, message_id: str, text: str, *args: Any) -> None:
+        self.text = text
+
+    def clear(self, message_id: str) -> None:
+        self.text = None
+
+
+class Baseline:
+    """
+    Plugin state and hooks as they were in load.py.
+    """
+
+    def __init__(self, journal_dir: str, jump_num: int = 3, show_distance: bool = True, show_starclass: bool = True,
+                 show_indicators: bool = True):
+        self.journal_dir: str = journal_dir
+        self.formatter = Formatter()
+        self.logger: logging.Logger = logging.getLogger('navroute.baseline')
+        self.jump_num: Var = Var(jump_num)
+        self.show_distance: Var = Var(show_distance)
+        self.show_starclass: Var = Var(show_starclass)
+        self.show_indicators: Var = Var(show_indicators)
+
+        self.current_system: str = "Unknown"
+        self.current_system_class: str | None = None
+        self.next_system_class: str | None = None
+        self.route: list[dict[str, Any]] = []
+        self.total_distance: float = 0
+        self.straight_distance: float = 0
+
+        self.remain_label: dict[str, str] = {'text': 'NavRoute: Plot a Route to Begin'}
+        self.navroute_label: dict[str, str] = {'text': 'No NavRoute Set'}
+        self.search_route: bool = False
+        self.remaining_jumps: int = 0
+        self.overcharge_boost: bool = False
+        self.status: StatusFlags = StatusFlags(0)
+        self.status2: StatusFlags2 = StatusFlags2(0)
+
+        self.overlay = Overlay()
+        self.overlay_color: Var = Var('#ffffff')
+        self.overlay_size: Var = Var('Normal')
+        self.overlay_anchor_x: Var = Var(0)
+        self.overlay_anchor_y: Var = Var(0)
+
+    def parse_navroute(self):
+        logdir = self.journal_dir
+        try:
+            with open(join(logdir, 'NavRoute.json')) as f:
+                raw = f.read()
+
+            try:
+                data = json.loads(raw)
+                if data is not None:
+                    self.route = data['Route']
+                    self.remaining_jumps = len(self.route) - 1
+                    self.search_route = True
+                    self.parse_total_distance()
+
+            except json.JSONDecodeError as e:
+                self.logger.exception('Failed to decode NavRoute.json', exc_info=e)
+        except OSError as e:
+            self.logger.exception(f'Could not open navroute file.', exc_info=e)
+
+    def can_display_overlay(self, status: StatusFlags | None = None) -> bool:
+        if status is None:
+            status = self.status
+        if ((StatusFlags.IN_SHIP in status) and not (StatusFlags.DOCKED in status)
+                and not (StatusFlags.LANDED in status)):
+            return True
+        return False
+
+    def journal_entry(self, cmdr: str, is_beta: bool, system: str,
+                      station: str, entry: MutableMapping[str, Any], state: Mapping[str, Any]) -> str:
+        if self.current_system is None:
+            self.parse_navroute()
+        if system != self.current_system:
+            self.current_system = system if system is not None else ''
+            self.current_system_class = None
+        if state['NavRoute'] is not None and state['NavRoute']['Route'] != self.route:
+            self.route = state['NavRoute']['Route']
+            self.remaining_jumps = 0
+            self.search_route = True
+            self.parse_total_distance()
+
+        self.overcharge_boost = False
+        if state and 'FrameShiftDrive' in state.get('Modules', {}):
+            if state['Modules']['FrameShiftDrive']['Item'] == 'int_hyperdrive_overcharge_size8_class5_overchargebooster_mkii':
+                self.overcharge_boost = True
+
+        if entry['event'] == 'FSDTarget':
+            found = False
+            if self.route:
+                for nav in self.route:
+                    if nav['StarSystem'] == entry['Name']:
+                        found = True
+                        break
+            if found:
+                self.remaining_jumps = entry['RemainingJumpsInRoute']
+            else:
+                self.parse_navroute()
+
+        if self.route and self.search_route:
+            for i, nav in enumerate(self.route):
+                if nav['StarSystem'] == self.current_system:
+                    self.current_system_class = nav['StarClass']
+                    self.remaining_jumps = len(self.route) - (i + 1)
+                    break
+
+        match entry['event']:
+            case 'NavRoute':
+                if state['NavRoute'] is not None:
+                    self.route = state['NavRoute']['Route']
+                else:
+                    self.route = entry['Route']
+                self.remaining_jumps = len(self.route) - 1 if self.route else 0
+                self.search_route = True
+                self.parse_total_distance()
+                self.process_jumps()
+            case 'NavRouteClear':
+                if StatusFlags.FSD_JUMP_IN_PROGRESS not in self.status:
+                    self.remaining_jumps = 0
+                    self.route.clear()
+                    self.search_route = False
+                    self.remain_label['text'] = "NavRoute: NavRoute Cleared"
+                    self.navroute_label['text'] = "Plot a Route to Begin"
+                    self.total_distance = 0
+                    if self.overlay.available() and self.can_display_overlay():
+                        self.overlay.draw('navroute_display', 'NavRoute Cleared', self.overlay_anchor_x.get(),
+                                          self.overlay_anchor_y.get(), self.overlay_color.get(),
+                                          self.overlay_size.get().lower(), 10)
+            case 'StartJump':
+                self.next_system_class = entry['StarClass']
+            case 'FSDJump':
+                if self.next_system_class:
+                    self.current_system_class = self.next_system_class
+                    self.next_system_class = None
+                if len(self.route):
+                    if entry['StarSystem'] == self.route[-1]['StarSystem']:
+                        self.remain_label['text'] = 'NavRoute: Route Complete!'
+                        self.navroute_label['text'] = 'No NavRoute Destination Set'
+                        self.remaining_jumps = 0
+                        self.route.clear()
+                        self.search_route = False
+                        self.total_distance = 0
+                        if self.overlay.available() and self.can_display_overlay():
+                            self.overlay.draw('navroute_display', 'NavRoute Complete!',
+                                              self.overlay_anchor_x.get(), self.overlay_anchor_y.get(),
+                                              self.overlay_color.get(), self.overlay_size.get().lower(), 10)
+                    else:
+                        found = False
+                        for nav in self.route:
+                            if nav['StarSystem'] == entry['StarSystem']:
+                                found = True
+                                break
+                        if found:
+                            self.process_jumps()
+                        else:
+                            self.remain_label['text'] = 'NavRoute: Diverted From Route!'
+                            nearest_system = ('', -1)
+                            for nav in self.route:
+                                distance = self.get_distance(entry['StarPos'], nav['StarPos'])
+                                if nearest_system[1] == -1 or distance < nearest_system[1]:
+                                    nearest_system = (nav['StarSystem'], distance)
+                            divert_text = f'Recalculate or Jump\n{nearest_system[0]} to Resume\n({self.formatter.format_distance(nearest_system[1], 'ly', False)})'
+                            self.navroute_label['text'] = divert_text
+                            if self.overlay.available() and self.can_display_overlay():
+                                self.overlay.display('navroute_display', divert_text.replace('\n', ' '), self.overlay_anchor_x.get(),
+                                                     self.overlay_anchor_y.get(), self.overlay_color.get())
+                else:
+                    self.remain_label['text'] = 'NavRoute: No NavRoute Set'
+                    self.navroute_label['text'] = 'Plot a Route to Begin'
+                    if self.overlay.available() and self.can_display_overlay():
+                        self.overlay.clear('navroute_display')
+
+        if self.search_route:
+            self.search_route = False
+            self.process_jumps()
+
+        return ''
+
+    def get_distance(self, a: tuple[float, float, float], b: tuple[float, float, float]) -> float:
+        return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
+
+    def parse_total_distance(self) -> None:
+        self.straight_distance = self.get_distance(self.route[0]['StarPos'], self.route[-1]['StarPos'])
+        total_distance = 0
+        last_pos = self.route[0]['StarPos']
+        for i, nav in enumerate(self.route[1:]):
+            total_distance += self.get_distance(nav['StarPos'], last_pos)
+            last_pos = nav['StarPos']
+        self.total_distance = total_distance
+
+    def dashboard_entry(self, cmdr: str, is_beta: bool, entry: dict[str, any]) -> str:
+        """
+        EDMC dashboard entry hook. Parses updates to the Status.json.
+        Used to determine planetary location data. Used by waypoints, organic scans, and display focus.
+
+        :param cmdr: Commander name (unused)
+        :param is_beta: Beta status (unused)
+        :param entry: Dictionary of status file data
+        :return: Result string. Empty means success.
+        """
+
+        old_status = self.status
+        self.status = StatusFlags(entry['Flags'])
+        self.status2 = StatusFlags2(0)
+        if 'Flags2' in entry:
+            self.status2 = StatusFlags2(entry['Flags2'])
+
+        if self.can_display_overlay(old_status) != self.can_display_overlay():
+            self.process_jumps()
+
+        return ''
+
+    def star_display(self, star_class: str | None, indicators: bool = True) -> str:
+        if star_class is None:
+            return ''
+
+        if indicators:
+            match star_class:
+                case 'M' | 'K' | 'G' | 'F' | 'A' | 'B' | 'O':
+                    return f'\N{FUEL PUMP}{star_class}'
+                case 'N':
+                    return '\N{HIGH VOLTAGE SIGN}{}N'.format('×6 ' if self.overcharge_boost else '×4 ')
+
+            if star_class.startswith('D'):
+                return '\N{HIGH VOLTAGE SIGN}{}{}'.format('×3 ' if self.overcharge_boost else '×1.5 ', star_class)
+
+        return star_class
+
+    def process_jumps(self) -> None:
+        if not self.route:
+            self.remain_label['text'] = 'NavRoute: No NavRoute Set'
+            self.navroute_label['text'] = 'Plot a Route to Begin'
+
+            if self.overlay.available() and self.can_display_overlay():
+                self.overlay.clear('navroute_display')
+            return
+
+        remaining_route = self.route[-self.remaining_jumps:]
+        route_from_here = self.route[-(self.remaining_jumps+1):]
+        last_system = self.route[-1]
+        display = '{}{}'.format(self.current_system, f' [{self.star_display(self.current_system_class, self.show_indicators.get())}]')
+        remaining_distance = 0
+
+        for i, jump in enumerate(remaining_route):
+            if i >= self.jump_num.get() or i == (len(remaining_route)):
+                remainder_distance = 0
+                for j, jump_remainder in enumerate(remaining_route[i:]):
+                    remainder_distance += self.get_distance(jump_remainder['StarPos'], remaining_route[i-1:][j]['StarPos'])
+                remaining_distance += remainder_distance
+                display += ((f' - {self.formatter.format_distance(remainder_distance, 'ly', False)} -> ' if self.show_distance.get() else ' -> ') +
+                            f'{last_system["StarSystem"]} [{self.star_display(last_system["StarClass"], self.show_indicators.get())}]') if self.show_starclass.get() \
+                    else f' - {self.formatter.format_distance(remainder_distance, 'ly', False)} -> {last_system["StarSystem"]}'
+                break
+            else:
+                distance = self.get_distance(jump['StarPos'], route_from_here[i]['StarPos'])
+                remaining_distance += distance
+                display += ((f' - {self.formatter.format_distance(distance, 'ly', False)} -> ' if self.show_distance.get() else ' -> ') +
+                            f'{jump["StarSystem"]}' + f' [{self.star_display(jump["StarClass"], self.show_indicators.get())}]') if self.show_starclass.get() \
+                    else f' - {self.formatter.format_distance(distance, 'ly', False)} -> {jump["StarSystem"]}' if self.show_distance.get() else f'{jump["StarSystem"]}'
+                if i == (self.jump_num.get() - 1) and i < len(remaining_route) - 2:
+                    display += f' | +{self.remaining_jumps - self.jump_num.get() - 1} Jump{"s"[:self.remaining_jumps ^ 1]}'
+
+        if len(display) > 60:
+            display = '\n-> '.join(display.split(' -> '))
+
+        distance_ratio = f'{self.formatter.format_distance(remaining_distance, '', False)}/{self.formatter.format_distance(self.total_distance, 'ly', False)}'
+        self.remain_label['text'] = (f'NavRoute ({self.formatter.format_distance(self.straight_distance, 'ly', False)},'
+                                     f' {(self.straight_distance/self.total_distance*100):.1f}% efficiency)\n '
+                                     f'{self.remaining_jumps} Jump{"s"[:self.remaining_jumps ^ 1]} Remaining ({distance_ratio})')
+        self.navroute_label['text'] = display
+
+        if self.overlay.available():
+            if self.can_display_overlay():
+                overlay_text = f'{self.remaining_jumps} Jump{"s"[:self.remaining_jumps ^ 1]} ({distance_ratio}): ' + display.replace('\n', ' ')
+                self.overlay.display('navroute_display', overlay_text, self.overlay_anchor_x.get(),
+                                     self.overlay_anchor_y.get(), self.overlay_color.get(), self.overlay_size.get().lower())
+            else:
+                self.overlay.clear('navroute_display')
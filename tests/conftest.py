@@ -0,0 +1,16 @@
+"""
+Test setup. The plugin modules are imported from src. Outside of EDMC the plugin logger falls back to the standard
+logging module.
+"""
+
+import logging
+import sys
+import types
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(dirname(__file__)), 'src'))
+
+try:
+    import EDMCLogging
+except ImportError:
+    sys.modules['EDMCLogging'] = types.SimpleNamespace(get_plugin_logger=logging.getLogger)
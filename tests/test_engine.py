@@ -0,0 +1,89 @@
+import threading
+
+from baseline import Overlay
+from navroute.engine import RouteEngine, Settings, Snapshot
+from navroute.format_util import Formatter
+from navroute.status_flags import StatusFlags
+from navroute.template import DisplayTemplates
+
+ROUTE = [{'StarSystem': f'S{i}', 'SystemAddress': i, 'StarClass': 'K', 'StarPos': [i * 10.0, 0, 0]}
+         for i in range(4)]
+IN_FLIGHT = StatusFlags.IN_SHIP.value
+
+
+def test_worker_survives_snapshot_errors(tmp_path):
+    snapshots: list[Snapshot] = []
+    delivered = threading.Event()
+
+    def on_snapshot(snapshot: Snapshot) -> None:
+        snapshots.append(snapshot)
+        if len(snapshots) == 1:
+            raise RuntimeError('Display is gone')
+        delivered.set()
+
+    engine = RouteEngine(str(tmp_path), Formatter(), Overlay(), on_snapshot)
+    engine.start()
+    try:
+        engine.submit('settings', Settings(str(tmp_path), 3, DisplayTemplates(), False, False, '#ffffff', 'Normal',
+                                           0, 0))
+        engine.submit('journal', 'S0', {'event': 'NavRoute'}, {'Route': ROUTE}, None)
+        assert not delivered.wait(0.5)
+        engine.submit('journal', 'S1', {'event': 'FSDJump', 'StarSystem': 'S1', 'StarPos': [10.0, 0, 0]},
+                      {'Route': ROUTE}, None)
+        assert delivered.wait(2)
+        assert snapshots[-1].display.startswith('S1')
+    finally:
+        engine.stop()
+
+
+def jump_engine(tmp_path) -> RouteEngine:
+    engine = RouteEngine(str(tmp_path), Formatter(), Overlay(), lambda snapshot: None)
+    engine.settings = Settings(str(tmp_path), 3, DisplayTemplates(), False, False, '#ffffff', 'Normal', 0, 0)
+    engine._journal_entry('S0', {'event': 'NavRoute'}, {'Route': ROUTE}, None)
+    return engine
+
+
+def run_jump(engine: RouteEngine, jump_type: str, next_destination: int = 1) -> None:
+    destination = {'System': 1, 'Body': 0, 'Name': 'S1'}
+    engine._dashboard_entry({'Flags': IN_FLIGHT, 'Destination': destination})
+    engine._dashboard_entry({'Flags': IN_FLIGHT | StatusFlags.FSD_CHARGING.value, 'Destination': destination})
+    start_jump = {'event': 'StartJump', 'JumpType': jump_type}
+    if jump_type == 'Hyperspace':
+        start_jump.update(StarSystem='S1', StarClass='K')
+    engine._journal_entry('S0', start_jump, {'Route': ROUTE}, None)
+    engine._dashboard_entry({'Flags': IN_FLIGHT | StatusFlags.FSD_JUMP_IN_PROGRESS.value,
+                             'Destination': destination})
+    engine._dashboard_entry({'Flags': IN_FLIGHT, 'Destination': {'System': next_destination, 'Body': 0,
+                                                                 'Name': f'S{next_destination}'}})
+
+
+def test_hyperspace_jump_lands_before_journal(tmp_path):
+    engine = jump_engine(tmp_path)
+    run_jump(engine, 'Hyperspace')
+    assert (engine.current_system, engine.remaining_jumps) == ('S1', 2)
+    landed = (engine.summary, engine.display)
+
+    engine._journal_entry('S1', {'event': 'FSDJump', 'StarSystem': 'S1', 'StarPos': [10.0, 0, 0]},
+                          {'Route': ROUTE}, None)
+    assert (engine.summary, engine.display) == landed
+
+
+def test_landing_with_next_destination_keeps_arrival(tmp_path):
+    # The game targets the next route system as the jump ends, in the same Status.json update
+    engine = jump_engine(tmp_path)
+    run_jump(engine, 'Hyperspace', next_destination=2)
+    assert (engine.current_system, engine.remaining_jumps) == ('S1', 2)
+    assert engine.display.startswith('S1')
+    landed = (engine.summary, engine.display)
+
+    engine._journal_entry('S1', {'event': 'FSDJump', 'StarSystem': 'S1', 'StarPos': [10.0, 0, 0]},
+                          {'Route': ROUTE}, None)
+    assert (engine.summary, engine.display) == landed
+
+
+def test_supercruise_entry_stays_in_system(tmp_path):
+    engine = jump_engine(tmp_path)
+    before = (engine.summary, engine.display)
+    run_jump(engine, 'Supercruise')
+    assert (engine.current_system, engine.remaining_jumps) == ('S0', 3)
+    assert (engine.summary, engine.display) == before
@@ -0,0 +1,43 @@
+import pytest
+
+from navroute.fuel import FuelTable, parse_fsd
+from navroute.route import Route
+
+FSD_5A = {'Item': 'int_hyperdrive_size5_class5'}
+
+
+def test_standard_drive():
+    fsd = parse_fsd(FSD_5A)
+    assert fsd is not None
+    assert (fsd.optimal_mass, fsd.max_fuel, fsd.fuel_multiplier, fsd.power) == (1050, 5.0, 0.012, 2.45)
+    assert fsd.fuel_cost(fsd.max_range(400), 400) == pytest.approx(fsd.max_fuel)
+
+
+def test_engineered_drive():
+    fsd = parse_fsd({'Item': 'Int_Hyperdrive_Size5_Class5', 'Engineering': {'Modifiers': [
+        {'Label': 'FSDOptimalMass', 'Value': 1627.5}, {'Label': 'MaxFuelPerJump', 'Value': 5.2}]}})
+    assert (fsd.optimal_mass, fsd.max_fuel) == (1627.5, 5.2)
+
+
+@pytest.mark.parametrize('item', ['int_hyperdrive_overcharge_size5_class5',
+                                  'int_hyperdrive_overcharge_size8_class5_overchargebooster_mkii'])
+def test_sco_drives_are_not_modelled(item: str):
+    assert parse_fsd({'Item': item}) is None
+
+
+def test_guardian_booster_extends_range():
+    fsd = parse_fsd(FSD_5A)
+    boosted = parse_fsd(FSD_5A, [{'Slot': 'Slot03_Size5', 'Item': 'int_guardianfsdbooster_size5'}])
+    assert boosted.max_range(400) == pytest.approx(fsd.max_range(400) + 10.5)
+    # A full-range boosted jump uses the drive's maximum fuel per jump
+    assert boosted.fuel_cost(boosted.max_range(400), 400) == pytest.approx(boosted.max_fuel)
+    assert boosted.fuel_cost(20, 400) < fsd.fuel_cost(20, 400)
+
+
+def test_fuel_table_warnings():
+    fsd = parse_fsd(FSD_5A)
+    systems = [{'StarSystem': f'S{i}', 'StarClass': star, 'StarPos': [x, 0, 0]}
+               for i, (star, x) in enumerate([('K', 0), ('Y', 20), ('T', 40), ('L', 60), ('Y', 100)])]
+    table = FuelTable(Route(systems), fsd, 380, 16, 4, 0, 0)
+    # 20 ly jumps use about 1.6t each, so the third runs the tank dry and the 40 ly jump is out of range
+    assert [table.warning(i) for i in range(len(systems))] == ['', '', '', ' !fuel', ' !range']
@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+from os.path import basename
+
+import pytest
+
+from navroute import history
+from navroute.history import STAT_KEYS, HistoryScanner, scan_journal
+
+
+def write_journal(path, entries) -> str:
+    path.write_text('\n'.join(json.dumps(entry) for entry in entries) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_plotted_and_flown_efficiency(tmp_path):
+    route = [{'StarSystem': 'O', 'StarPos': [0, 0, 0]}, {'StarSystem': 'A', 'StarPos': [30, 40, 0]},
+             {'StarSystem': 'B', 'StarPos': [60, 0, 0]}]
+    stats = scan_journal(write_journal(tmp_path / 'Journal.1.log', [
+        {'timestamp': '2026-01-01T00:00:00Z', 'event': 'Location', 'StarPos': [0, 0, 0]},
+        {'timestamp': '2026-01-01T00:00:10Z', 'event': 'NavRoute', 'Route': route},
+        {'timestamp': '2026-01-01T00:01:00Z', 'event': 'FSDJump', 'StarSystem': 'X', 'StarPos': [0, 60, 0],
+         'JumpDist': 60},
+        {'timestamp': '2026-01-01T00:02:00Z', 'event': 'FSDJump', 'StarSystem': 'B', 'StarPos': [60, 0, 0],
+         'JumpDist': 90},
+    ]))
+    assert stats['routes_completed'] == 1
+    assert stats['diversions'] == 1
+    # Plotted efficiency uses the route legs, like the route display: 60 / (50 + 50)
+    assert stats['efficiency_count'] == 1
+    assert stats['efficiency_total'] == pytest.approx(0.6)
+    # Flown efficiency uses the distance actually flown: 60 / 150
+    assert stats['flown_efficiency_count'] == 1
+    assert stats['flown_efficiency_total'] == pytest.approx(0.4)
+
+
+def test_plotted_efficiency_needs_route_list(tmp_path):
+    stats = scan_journal(write_journal(tmp_path / 'Journal.2.log', [
+        {'timestamp': '2026-01-01T00:00:00Z', 'event': 'Location', 'StarPos': [0, 0, 0]},
+        {'timestamp': '2026-01-01T00:00:10Z', 'event': 'NavRoute'},
+        {'timestamp': '2026-01-01T00:00:20Z', 'event': 'FSDTarget', 'Name': 'B', 'RemainingJumpsInRoute': 1},
+        {'timestamp': '2026-01-01T00:01:00Z', 'event': 'FSDJump', 'StarSystem': 'B', 'StarPos': [60, 0, 0],
+         'JumpDist': 60},
+    ]))
+    assert stats['routes_completed'] == 1
+    assert stats['efficiency_count'] == 0
+    assert stats['flown_efficiency_total'] == pytest.approx(1.0)
+
+
+def jump(second: int, system: str, x: float) -> dict:
+    return {'timestamp': f'2026-01-01T00:{second // 60:02d}:{second % 60:02d}Z', 'event': 'FSDJump',
+            'StarSystem': system, 'StarPos': [x, 0, 0], 'JumpDist': 10}
+
+
+def run_scan(scanner: HistoryScanner, journal_dir: str) -> dict[str, float]:
+    results: list[dict[str, float] | None] = []
+    assert scanner.start(journal_dir, results.append)
+    # The callback runs on the scanner thread, so the next scan can start once it has finished
+    scanner._thread.join(10)
+    assert results and results[0] is not None
+    return results[0]
+
+
+def test_scanner_only_parses_changed_journals(tmp_path, monkeypatch):
+    # Frozen builds parse on the scanner thread, which lets the parsed files be counted
+    monkeypatch.setattr(sys, 'frozen', True, raising=False)
+    parsed: list[str] = []
+
+    def counting_scan(path: str) -> dict[str, float]:
+        parsed.append(basename(path))
+        return scan_journal(path)
+
+    monkeypatch.setattr(history, 'scan_journal', counting_scan)
+    journal_dir = tmp_path / 'journal'
+    journal_dir.mkdir()
+    for i in range(3):
+        write_journal(journal_dir / f'Journal.{i}.log', [
+            {'timestamp': '2026-01-01T00:00:00Z', 'event': 'NavRoute'},
+            *[jump(60 * j, f'S{j}', 10.0 * j) for j in range(1, i + 2)],
+        ])
+    write_journal(journal_dir / 'Other.log', [jump(60, 'S1', 10)])
+    scanner = HistoryScanner(str(tmp_path / 'history.json'))
+
+    totals = run_scan(scanner, str(journal_dir))
+    assert sorted(parsed) == ['Journal.0.log', 'Journal.1.log', 'Journal.2.log']
+    assert (totals['routes_plotted'], totals['jumps']) == (3, 6)
+
+    parsed.clear()
+    assert run_scan(scanner, str(journal_dir)) == totals
+    assert parsed == []
+
+    changed = journal_dir / 'Journal.1.log'
+    with open(changed, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(jump(300, 'S9', 90)) + '\n')
+    info = os.stat(changed)
+    os.utime(changed, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+    totals = run_scan(scanner, str(journal_dir))
+    assert parsed == ['Journal.1.log']
+
+    per_file = [scan_journal(str(journal_dir / f'Journal.{i}.log')) for i in range(3)]
+    assert totals == {key: sum(stats[key] for stats in per_file) for key in STAT_KEYS}
+    assert totals['jumps'] == 7
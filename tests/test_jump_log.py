@@ -0,0 +1,84 @@
+import pytest
+
+from navroute.format_util import Formatter
+from navroute.jump_log import HEADER, RECORD, REPLAY_RECORDS, SESSION_GAP, JumpLog, JumpStats
+
+
+def replayed(path: str, count: int = REPLAY_RECORDS) -> list[tuple[float, float]]:
+    updates: list[tuple[float, float]] = []
+
+    class Recorder(JumpStats):
+        def update(self, timestamp: float, distance: float) -> None:
+            updates.append((timestamp, distance))
+            super().update(timestamp, distance)
+
+    JumpLog(path).replay(Recorder(), count)
+    return updates
+
+
+def test_append_and_replay_round_trip(tmp_path):
+    path = str(tmp_path / 'jumps.bin')
+    log = JumpLog(path)
+    jumps = [(1000.0 + 60 * i, 40.0 + i) for i in range(5)]
+    for timestamp, distance in jumps:
+        log.append(timestamp, distance)
+    log.append(1000.0, 99.0)  # Not after the last jump
+    assert replayed(path) == jumps
+
+    stats, reopened = JumpStats(), JumpLog(path)
+    reopened.replay(stats)
+    assert stats.interval == 60
+    assert reopened.last_timestamp == jumps[-1][0]
+
+
+def test_truncated_record_is_dropped(tmp_path):
+    path = str(tmp_path / 'jumps.bin')
+    log = JumpLog(path)
+    log.append(1000.0, 40.0)
+    log.append(1060.0, 41.0)
+    with open(path, 'ab') as f:
+        f.write(RECORD.pack(1120.0, 42.0)[:5])
+
+    log = JumpLog(path)
+    log.append(1180.0, 43.0)
+    assert replayed(path) == [(1000.0, 40.0), (1060.0, 41.0), (1180.0, 43.0)]
+
+
+@pytest.mark.parametrize('header', [b'XXXX\x01\x00\x00\x00', HEADER.pack(b'NRJL', 99), b'NR'])
+def test_bad_header_starts_new_log(tmp_path, header: bytes):
+    path = tmp_path / 'jumps.bin'
+    path.write_bytes(header + RECORD.pack(1000.0, 40.0))
+    JumpLog(str(path)).append(2000.0, 50.0)
+    assert replayed(str(path)) == [(2000.0, 50.0)]
+
+
+def test_replay_reads_last_records(tmp_path):
+    path = str(tmp_path / 'jumps.bin')
+    log = JumpLog(path)
+    jumps = [(1000.0 + 60 * i, float(i)) for i in range(REPLAY_RECORDS + 50)]
+    for timestamp, distance in jumps:
+        log.append(timestamp, distance)
+    assert replayed(path) == jumps[-REPLAY_RECORDS:]
+    assert replayed(path, 10) == jumps[-10:]
+
+
+def test_stats_ignore_session_gaps():
+    stats = JumpStats()
+    stats.update(1000, 40)
+    assert stats.eta(10) is None
+    stats.update(1000 + SESSION_GAP, 40)
+    stats.update(1000 + 2 * SESSION_GAP + 1, 40)
+    assert stats.interval is None
+    assert (stats.eta(10), stats.jumps_per_hour(), stats.ly_per_hour()) == (None, None, None)
+
+    stats.update(1000 + 2 * SESSION_GAP + 61, 40)
+    assert stats.interval == 60
+    assert (stats.eta(10), stats.jumps_per_hour(), stats.ly_per_hour()) == (600, 60, 2400)
+
+
+@pytest.mark.parametrize('seconds, text', [
+    (0, '<1m'), (29, '<1m'), (31, '1m'), (59 * 60, '59m'), (3600, '1h 00m'), (3600 + 59 * 60, '1h 59m'),
+    (86400 - 60, '23h 59m'), (86400, '1d 0h'), (86400 + 5 * 3600 + 60, '1d 5h'),
+])
+def test_format_duration(seconds: float, text: str):
+    assert Formatter().format_duration(seconds) == text
@@ -0,0 +1,120 @@
+import json
+import socket
+import time
+
+import pytest
+
+from navroute.publisher import RoutePublisher, Subscriber
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_stop_releases_port():
+    port = free_port()
+    publisher = RoutePublisher(port)
+    publisher.start()
+    publisher.stop()
+    assert not publisher.running()
+    with pytest.raises(OSError):
+        socket.create_connection(('127.0.0.1', port), timeout=1).close()
+
+    restarted = RoutePublisher(port)
+    restarted.start()
+    try:
+        assert restarted.running()
+        restarted.publish({'current_system': 'Sol'})
+        with socket.create_connection(('127.0.0.1', port), timeout=1) as client:
+            message = json.loads(client.makefile().readline())
+        assert message['type'] == 'snapshot'
+        assert message['state'] == {'current_system': 'Sol'}
+    finally:
+        restarted.stop()
+
+
+def read_message(stream) -> dict:
+    line = stream.readline()
+    assert line, 'Connection closed'
+    return json.loads(line)
+
+
+def test_publish_sends_only_changes():
+    publisher = RoutePublisher(free_port())
+    publisher.start()
+    try:
+        publisher.publish({'current_system': 'Sol', 'remaining_jumps': 3})
+        with socket.create_connection(('127.0.0.1', publisher.port), timeout=1) as client, \
+                client.makefile('rb') as stream:
+            snapshot = read_message(stream)
+            assert snapshot['type'] == 'snapshot'
+
+            publisher.publish({'current_system': 'Sol', 'remaining_jumps': 3})
+            client.settimeout(0.3)
+            with pytest.raises(TimeoutError):
+                client.recv(1)
+
+            client.settimeout(1)
+            publisher.publish({'current_system': 'Alpha Centauri', 'remaining_jumps': 3})
+            delta = read_message(stream)
+            assert delta['type'] == 'delta'
+            assert delta['state'] == {'current_system': 'Alpha Centauri'}
+            assert delta['version'] == snapshot['version'] + 1
+    finally:
+        publisher.stop()
+
+
+def test_full_backlog_is_replaced_by_snapshot():
+    publisher = RoutePublisher(free_port())
+    connection, client = socket.socketpair()
+    # Not started, so nothing drains the queue
+    subscriber = Subscriber(publisher, connection, max_backlog=4)
+    publisher._subscribers.append(subscriber)
+    for jumps in range(6):
+        publisher.publish({'remaining_jumps': jumps})
+
+    queued = [json.loads(message) for message in list(subscriber.messages.queue)]
+    assert [message['type'] for message in queued] == ['snapshot', 'delta']
+    assert queued[0]['state'] == {'remaining_jumps': 4} and queued[0]['version'] == 5
+    assert queued[1]['state'] == {'remaining_jumps': 5} and queued[1]['version'] == 6
+    connection.close()
+    client.close()
+
+
+def test_slow_client_does_not_block_publish():
+    publisher = RoutePublisher(free_port())
+    publisher.start()
+    client = socket.socket()
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    try:
+        client.connect(('127.0.0.1', publisher.port))
+        client.settimeout(5)
+        with client.makefile('rb') as stream:
+            assert read_message(stream)['type'] == 'snapshot'
+
+            # Far more than the socket buffers hold, so the sending thread blocks while the client isn't reading
+            start = time.perf_counter()
+            for i in range(100):
+                publisher.publish({'remaining_jumps': i, 'padding': str(i) * 100_000})
+            assert time.perf_counter() - start < 2
+
+            # The client falls behind and is resynced, the state it rebuilds still ends up current
+            state: dict = {}
+            version = 0
+            snapshots = 0
+            while version < 100:
+                message = read_message(stream)
+                if message['type'] == 'snapshot':
+                    snapshots += 1
+                    state = message['state']
+                else:
+                    assert message['version'] == version + 1
+                    state.update(message['state'])
+                version = message['version']
+        assert snapshots >= 1
+        assert state == {'remaining_jumps': 99, 'padding': '99' * 100_000}
+    finally:
+        client.close()
+        publisher.stop()
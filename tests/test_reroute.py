@@ -0,0 +1,137 @@
+import os
+import random
+import threading
+from collections import deque
+from typing import Any
+
+import pytest
+
+from navroute.reroute import GoalIndex, Rerouter, StarCatalog, boost_factor, find_reroute
+from navroute.route import Route, get_distance
+
+SEED = int(os.environ.get('NAVROUTE_SEED', '2026'))
+STAR_CLASSES = ['M', 'K', 'G', 'N', 'DA', 'DC']
+
+
+def random_catalog(rnd: random.Random, count: int, size: float) -> StarCatalog:
+    catalog = StarCatalog(cell_size=25)
+    for i in range(count):
+        catalog.add(f'Sys{i}', tuple(rnd.uniform(0, size) for _ in range(3)), rnd.choice(STAR_CLASSES))
+    return catalog
+
+
+def fewest_jumps(catalog: StarCatalog, start: int, goals: dict[int, int], jump_range: float,
+                 use_boosts: bool) -> int | None:
+    """
+    Breadth-first search over every pair of systems.
+    """
+
+    jumps = {start: 0}
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+        if current in goals:
+            return jumps[current]
+        reach = jump_range * (boost_factor(catalog.classes[current]) if use_boosts else 1)
+        for other, position in enumerate(catalog.positions):
+            if other not in jumps and get_distance(catalog.positions[current], position) <= reach:
+                jumps[other] = jumps[current] + 1
+                queue.append(other)
+    return None
+
+
+def line_catalog(count: int) -> StarCatalog:
+    catalog = StarCatalog()
+    for i in range(count):
+        catalog.add(f'Line{i}', (i * 10.0, 0, 0), 'K')
+    return catalog
+
+
+@pytest.mark.parametrize('use_boosts', [False, True])
+def test_fewest_jumps_match_breadth_first_search(use_boosts: bool):
+    rnd = random.Random(SEED)
+    for case in range(40):
+        catalog = random_catalog(rnd, 250, 200)
+        start = rnd.randrange(len(catalog))
+        goals = {goal: i for i, goal in enumerate(rnd.sample(range(len(catalog)), rnd.randint(1, 4)))}
+        jump_range = rnd.uniform(25, 45)
+
+        path = find_reroute(catalog, start, goals, jump_range, use_boosts)
+        expected = fewest_jumps(catalog, start, goals, jump_range, use_boosts)
+        context = f'Seed {SEED}, case {case}'
+        if expected is None:
+            assert path is None, context
+            continue
+        assert path is not None and len(path) - 1 == expected, context
+        assert path[0] == start and path[-1] in goals, context
+        for a, b in zip(path, path[1:]):
+            reach = jump_range * (boost_factor(catalog.classes[a]) if use_boosts else 1)
+            assert get_distance(catalog.positions[a], catalog.positions[b]) <= reach, context
+
+
+def test_goal_index_matches_linear_scan():
+    rnd = random.Random(SEED)
+    for case in range(200):
+        positions = [tuple(rnd.uniform(-300, 300) for _ in range(3)) for _ in range(rnd.randint(1, 60))]
+        index = GoalIndex(positions, rnd.choice([5, 20, 50, 200]))
+        for _ in range(20):
+            query = tuple(rnd.uniform(-1000, 1000) for _ in range(3))
+            expected = min(get_distance(query, position) for position in positions)
+            assert index.nearest_distance(query) == expected, f'Seed {SEED}, case {case}'
+
+
+def test_deadline_returns_none():
+    catalog = line_catalog(300)
+    assert len(find_reroute(catalog, 0, {299: 0}, 10.5)) == 300
+    assert find_reroute(catalog, 0, {299: 0}, 10.5, deadline=0) is None
+
+    cancelled = threading.Event()
+    cancelled.set()
+    assert find_reroute(catalog, 0, {299: 0}, 10.5, cancelled=cancelled) is None
+
+
+def rerouter(tmp_path, time_budget: float = 2.0) -> tuple[Rerouter, Route]:
+    path = tmp_path / 'catalog.csv'
+    path.write_text(''.join(f'Line{i},{i * 10.0},0,0,K\n' for i in range(1, 300)), encoding='utf-8')
+    route = Route([{'StarSystem': 'Line299', 'StarPos': [2990.0, 0, 0], 'StarClass': 'K'},
+                   {'StarSystem': 'Beyond', 'StarPos': [3000.0, 0, 0], 'StarClass': 'K'}])
+    return Rerouter(str(path), time_budget), route
+
+
+def test_superseded_and_cancelled_requests_skip_callback(tmp_path):
+    router, route = rerouter(tmp_path)
+    results: list[tuple[int, Any]] = []
+    done = threading.Event()
+
+    def callback(request_id: int, path: list[dict[str, Any]] | None) -> None:
+        results.append((request_id, path))
+        done.set()
+
+    # Hold the search lock so both requests are still waiting when they are superseded or cancelled
+    with router._search_lock:
+        superseded = router.request('Line0', (0, 0, 0), 'K', route, 10.5, False, False, callback)
+        latest = router.request('Line0', (0, 0, 0), 'K', route, 10.5, False, False, callback)
+    assert done.wait(5)
+    assert [request_id for request_id, _ in results] == [latest] and superseded != latest
+    assert results[0][1][-1]['StarSystem'] == 'Line299'
+
+    done.clear()
+    with router._search_lock:
+        router.request('Line0', (0, 0, 0), 'K', route, 10.5, False, False, callback)
+        router.cancel()
+    assert not done.wait(0.5)
+    assert len(results) == 1
+
+
+def test_time_budget_reports_no_path(tmp_path):
+    router, route = rerouter(tmp_path, time_budget=0)
+    results: list[tuple[int, Any]] = []
+    done = threading.Event()
+
+    def callback(request_id: int, path: list[dict[str, Any]] | None) -> None:
+        results.append((request_id, path))
+        done.set()
+
+    request_id = router.request('Line0', (0, 0, 0), 'K', route, 10.5, False, False, callback)
+    assert done.wait(5)
+    assert results == [(request_id, None)]
@@ -0,0 +1,57 @@
+"""
+Reloading a route reuses the data of the section shared with the previous route. The result must match a route loaded
+from scratch. Set NAVROUTE_SEED to reproduce or vary a run.
+"""
+
+import os
+import random
+from typing import Any
+
+import pytest
+
+from navroute.route import Route
+
+SEED = int(os.environ.get('NAVROUTE_SEED', '2026'))
+CASES = 2000
+
+
+def make_system(name: str) -> dict[str, Any]:
+    index = ord(name[0]) - ord('A')
+    return {'StarSystem': name, 'SystemAddress': index, 'StarClass': 'K', 'StarPos': [index * 7.0, index % 3, 0]}
+
+
+def assert_matches_fresh(old: list[dict[str, Any]], new: list[dict[str, Any]]) -> None:
+    route = Route(old)
+    route.load(new)
+    fresh = Route(new)
+    names = {s['StarSystem'] for s in old + new}
+    context = f'{[s["StarSystem"] for s in old]} -> {[s["StarSystem"] for s in new]}'
+    assert (route.total_distance, route.straight_distance) == (fresh.total_distance, fresh.straight_distance), context
+    for i in range(len(new)):
+        assert route.leg(i) == fresh.leg(i), context
+        assert route.distance_from(i) == fresh.distance_from(i), context
+    for name in names:
+        assert route.index(name) == fresh.index(name), context
+        assert route.address_index(ord(name) - ord('A')) == fresh.address_index(ord(name) - ord('A')), context
+
+
+@pytest.mark.parametrize('old, new', [('ABCA', 'XCA'), ('ABCA', 'ABX'), ('ABAB', 'XBAB'), ('AB', 'AB'), ('ABC', '')])
+def test_reload_matches_fresh_route(old: str, new: str):
+    assert_matches_fresh([make_system(s) for s in old], [make_system(s) for s in new])
+
+
+def test_seeded_reloads_match_fresh_route():
+    rnd = random.Random(SEED)
+    pool = 'ABCDEFGH'  # A small pool, so routes repeat systems
+    for _ in range(CASES):
+        old = [rnd.choice(pool) for _ in range(rnd.randint(0, 10))]
+        middle = [rnd.choice(pool) for _ in range(rnd.randint(0, 6))]
+        head, tail = rnd.randint(0, len(old)), rnd.randint(0, len(old))
+        match rnd.choice(['suffix', 'prefix', 'both']):
+            case 'suffix':
+                new = middle + old[len(old) - tail:]
+            case 'prefix':
+                new = old[:head] + middle
+            case _:
+                new = old[:head] + middle + old[max(head, len(old) - tail):]
+        assert_matches_fresh([make_system(s) for s in old], [make_system(s) for s in new])
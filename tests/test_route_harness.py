@@ -0,0 +1,299 @@
+"""
+Seeded differential harness for the route display. The navroute implementation is checked against the original
+load.py logic kept in baseline.py, over generated routes, display settings and journal event sequences. Each
+operation must also finish within its time budget, which grows linearly with the route length on long routes.
+
+Set NAVROUTE_SEED to reproduce or vary a run.
+"""
+
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import pytest
+
+from baseline import Baseline, Overlay
+from navroute.engine import RouteEngine, Settings
+from navroute.format_util import Formatter
+from navroute.route import Route, divert_text, plural, render_route
+from navroute.status_flags import StatusFlags
+from navroute.template import DisplayTemplates
+
+SEED = int(os.environ.get('NAVROUTE_SEED', '2026'))
+RENDER_CASES = 3000
+SEQUENCES = 300
+SEQUENCE_STEPS = 30
+
+RENDER_BUDGET = 0.02  # Seconds per route load and render
+EVENT_BUDGET = 0.05  # Seconds per journal or dashboard event, including any error logging
+SYSTEM_BUDGET = 0.00001  # Seconds added per route system. The original code is quadratic and exceeds it from ~2k.
+
+LONG_ROUTES = [1000, 4000, 16000]
+ORACLE_LIMIT = 4000  # Longest route the event sequences are checked against the slow original code for
+
+STAR_CLASSES = ['M', 'K', 'G', 'F', 'A', 'B', 'O', 'N', 'DA', 'DC', 'T', 'Y', 'H', 'TTS']
+MK2_MODULES = {'FrameShiftDrive': {'Item': 'int_hyperdrive_overcharge_size8_class5_overchargebooster_mkii'}}
+IN_FLIGHT = StatusFlags.IN_SHIP.value
+DOCKED = (StatusFlags.IN_SHIP | StatusFlags.DOCKED).value
+JUMPING = (StatusFlags.IN_SHIP | StatusFlags.FSD_JUMP_IN_PROGRESS).value
+
+
+@contextmanager
+def budget(seconds: float, operation: str) -> Iterator[None]:
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    assert elapsed <= seconds, f'{operation} took {elapsed * 1000:.1f} ms, the budget is {seconds * 1000:.0f} ms'
+
+
+def scaled(seconds: float, length: int) -> float:
+    return seconds + length * SYSTEM_BUDGET
+
+
+def make_systems(rnd: random.Random, count: int) -> list[dict[str, Any]]:
+    return [{'StarSystem': f'Sys{i}{"x" * rnd.randint(0, 8)}', 'SystemAddress': 1000 + i,
+             'StarClass': rnd.choice(STAR_CLASSES), 'StarPos': [rnd.uniform(-500, 500) for _ in range(3)]}
+            for i in range(count)]
+
+
+def baseline_render(route: list[dict[str, Any]], current_class: str | None, remaining_jumps: int, jump_num: int,
+                    show_distance: bool, show_starclass: bool, show_indicators: bool,
+                    overcharge: bool) -> tuple[str, str, str | None]:
+    base = Baseline('', jump_num, show_distance, show_starclass, show_indicators)
+    base.route = route
+    base.remaining_jumps = remaining_jumps
+    base.current_system = route[len(route) - 1 - remaining_jumps]['StarSystem']
+    base.current_system_class = current_class
+    base.overcharge_boost = overcharge
+    base.status = StatusFlags(IN_FLIGHT)
+    base.parse_total_distance()
+    base.process_jumps()
+    return base.remain_label['text'], base.navroute_label['text'], base.overlay.text
+
+
+def test_render_matches_baseline():
+    rnd = random.Random(SEED)
+    formatter = Formatter()
+    for case in range(RENDER_CASES):
+        length = rnd.choice([2, 2, 3, rnd.randint(4, 40)])
+        route = make_systems(rnd, length)
+        remaining_jumps = rnd.choice([1, length - 1, rnd.randint(1, length - 1)])
+        jump_num = rnd.choice([1, remaining_jumps - 1 or 1, remaining_jumps, remaining_jumps + 1, rnd.randint(1, 6)])
+        current_class = rnd.choice(STAR_CLASSES + [None])
+        flags = [rnd.random() < .5 for _ in range(4)]
+
+        expected = baseline_render(route, current_class, remaining_jumps, jump_num, *flags)
+        with budget(RENDER_BUDGET, f'Render case {case}'):
+            actual = render_route(Route(route), formatter, DisplayTemplates(*flags[:3]),
+                                  route[length - 1 - remaining_jumps]['StarSystem'], current_class,
+                                  remaining_jumps, jump_num, flags[3])
+        assert actual == expected, f'Seed {SEED}, case {case}'
+
+
+@pytest.mark.parametrize('remaining_jumps', range(1, 8))
+def test_plural_matches_baseline(remaining_jumps: int):
+    route = make_systems(random.Random(SEED), 8)
+    expected = baseline_render(route, 'K', remaining_jumps, 1, True, True, True, False)
+    actual = render_route(Route(route), Formatter(), DisplayTemplates(),
+                          route[7 - remaining_jumps]['StarSystem'], 'K', remaining_jumps, 1, False)
+    assert actual == expected
+    assert plural(remaining_jumps) == 's'[:remaining_jumps ^ 1]
+
+
+def test_divert_matches_baseline():
+    rnd = random.Random(SEED)
+    formatter = Formatter()
+    for case in range(RENDER_CASES):
+        route = make_systems(rnd, rnd.randint(2, 40))
+        position = [rnd.uniform(-600, 600) for _ in range(3)]
+        base = Baseline('')
+        base.route = route
+        base.current_system = 'Elsewhere'
+        base.status = StatusFlags(IN_FLIGHT)
+        base.parse_total_distance()
+        base.journal_entry('', False, 'Elsewhere', None,
+                           {'event': 'FSDJump', 'StarSystem': 'Elsewhere', 'StarPos': position},
+                           {'NavRoute': None, 'Modules': {}})
+
+        with budget(RENDER_BUDGET, f'Divert case {case}'):
+            text = divert_text(Route(route), formatter, position)
+        assert base.remain_label['text'] == 'NavRoute: Diverted From Route!'
+        assert text == base.navroute_label['text'], f'Seed {SEED}, case {case}'
+        assert text.replace('\n', ' ') == base.overlay.text
+
+
+def test_event_sequences_match_baseline(tmp_path):
+    rnd = random.Random(SEED)
+    journal_dir = str(tmp_path / 'journal')
+    for sequence in range(SEQUENCES):
+        jump_num = rnd.randint(1, 4)
+        flags = [rnd.random() < .5 for _ in range(3)]
+        base = Baseline(journal_dir, jump_num, *flags)
+        overlay = Overlay()
+        engine = RouteEngine(str(tmp_path), Formatter(), overlay, lambda snapshot: None)
+        engine.settings = Settings(journal_dir, jump_num, DisplayTemplates(*flags), False, False, '#ffffff',
+                                   'Normal', 0, 0)
+
+        systems = make_systems(rnd, 40)
+        current = systems[0]
+        route: list[dict[str, Any]] = []
+        state: dict[str, Any] = {'NavRoute': None, 'Modules': {}}
+        # The original code shares the route list with the game state and clears it in place, as it did with the
+        # EDMC state, so it gets its own copy of the state
+        base_state: dict[str, Any] = {'NavRoute': None, 'Modules': {}}
+        for step in range(SEQUENCE_STEPS):
+            kind = rnd.choice(['NavRoute', 'FSDJump', 'FSDJump', 'FSDTarget', 'StartJump', 'NavRouteClear',
+                               'Status', 'Other'])
+            context = f'Seed {SEED}, sequence {sequence}, step {step} ({kind})'
+            if kind == 'Status':
+                status = {'Flags': rnd.choice([0, IN_FLIGHT, DOCKED, JUMPING])}
+                base.dashboard_entry('', False, dict(status))
+                with budget(EVENT_BUDGET, context):
+                    engine._dashboard_entry(dict(status))
+            else:
+                entry: dict[str, Any] = {'event': kind}
+                if kind == 'NavRoute':
+                    route = [current] + rnd.sample([s for s in systems if s is not current], rnd.randint(1, 8))
+                    state['NavRoute'] = {'Route': route}
+                    base_state['NavRoute'] = {'Route': list(route)}
+                elif kind in ('FSDJump', 'StartJump', 'FSDTarget'):
+                    if current in route[:-1] and rnd.random() < .8:
+                        target = route[route.index(current) + 1]
+                    else:
+                        target = rnd.choice(systems)
+                    if kind == 'FSDJump':
+                        current = target
+                        # No timestamp, so no jump rate builds up and the ETA stays hidden as in the original
+                        entry.update(StarSystem=current['StarSystem'], StarPos=current['StarPos'], JumpDist=1)
+                    elif kind == 'StartJump':
+                        entry.update(StarClass=target['StarClass'])
+                    else:
+                        # Keep RemainingJumpsInRoute within the route, out of range counts are pinned below
+                        if target in route[1:]:
+                            remaining = len(route) - route.index(target)
+                        else:
+                            remaining = len(route) - 1 if target in route else 3
+                        entry.update(Name=target['StarSystem'], RemainingJumpsInRoute=remaining)
+                if rnd.random() < .1:
+                    state['Modules'] = base_state['Modules'] = MK2_MODULES
+
+                base.journal_entry('', False, current['StarSystem'], None, dict(entry), base_state)
+                with budget(EVENT_BUDGET, context):
+                    engine._journal_entry(current['StarSystem'], dict(entry), state['NavRoute'],
+                                          state['Modules'].get('FrameShiftDrive'))
+
+            assert (engine.summary, engine.display) == (base.remain_label['text'], base.navroute_label['text']), \
+                context
+            assert overlay.text == base.overlay.text, context
+
+
+@pytest.mark.parametrize('length', LONG_ROUTES)
+def test_long_route_render_matches_baseline(length: int):
+    rnd = random.Random(SEED + length)
+    route = make_systems(rnd, length)
+    for remaining_jumps in [length - 1, rnd.randint(1, length - 1), 1]:
+        expected = baseline_render(route, 'K', remaining_jumps, 3, True, True, True, False)
+        with budget(scaled(RENDER_BUDGET, length), f'Render of {length} systems, {remaining_jumps} remaining'):
+            actual = render_route(Route(route), Formatter(), DisplayTemplates(),
+                                  route[length - 1 - remaining_jumps]['StarSystem'], 'K', remaining_jumps, 3, False)
+        assert actual == expected, f'Seed {SEED}, {length} systems, {remaining_jumps} remaining'
+
+
+@pytest.mark.parametrize('length', LONG_ROUTES)
+def test_long_route_events_scale(tmp_path, length: int):
+    rnd = random.Random(SEED + length)
+    journal_dir = str(tmp_path / 'journal')
+    base = Baseline(journal_dir, 3, True, True, True)
+    overlay = Overlay()
+    engine = RouteEngine(str(tmp_path), Formatter(), overlay, lambda snapshot: None)
+    engine.settings = Settings(journal_dir, 3, DisplayTemplates(), False, False, '#ffffff', 'Normal', 0, 0)
+
+    route = make_systems(rnd, length)
+    # Re-plot from a few jumps in, with a new middle section and the original destination
+    detour = [dict(s, SystemAddress=s['SystemAddress'] + length) for s in make_systems(rnd, 20)]
+    replot = route[5:length // 2] + detour + route[length // 2 + 20:]
+    off_route = {'StarSystem': 'Elsewhere', 'StarPos': [700.0, 0, 0]}
+    steps: list[tuple[dict[str, Any], dict[str, Any]]] = [({'event': 'NavRoute'}, route[0])]
+    for i, system in enumerate(route[1:6], 1):
+        steps += [({'event': 'FSDTarget', 'Name': system['StarSystem'], 'RemainingJumpsInRoute': length - i}, None),
+                  ({'event': 'StartJump', 'StarClass': system['StarClass']}, None),
+                  ({'Flags': JUMPING}, None),
+                  ({'event': 'FSDJump', 'StarSystem': system['StarSystem'], 'StarPos': system['StarPos'],
+                    'JumpDist': 1}, system),
+                  ({'Flags': IN_FLIGHT}, None)]
+    steps += [({'event': 'NavRoute'}, None),
+              ({'event': 'FSDJump', 'StarSystem': 'Elsewhere', 'StarPos': off_route['StarPos'], 'JumpDist': 1},
+               off_route),
+              ({'event': 'NavRouteClear'}, None)]
+
+    state: dict[str, Any] = {'NavRoute': {'Route': route}, 'Modules': {}}
+    base_state: dict[str, Any] = {'NavRoute': {'Route': list(route)}, 'Modules': {}}
+    current = route[0]
+    for step, (entry, arrival) in enumerate(steps):
+        if arrival:
+            current = arrival
+        if entry.get('event') == 'NavRoute' and step:
+            state['NavRoute'] = {'Route': replot}
+            base_state['NavRoute'] = {'Route': list(replot)}
+        context = f'Seed {SEED}, {length} systems, step {step} ({entry.get("event", "Status")})'
+        if 'event' not in entry:
+            if length <= ORACLE_LIMIT:
+                base.dashboard_entry('', False, dict(entry))
+            with budget(scaled(EVENT_BUDGET, length), context):
+                engine._dashboard_entry(dict(entry))
+        else:
+            if length <= ORACLE_LIMIT:
+                base.journal_entry('', False, current['StarSystem'], None, dict(entry), base_state)
+            with budget(scaled(EVENT_BUDGET, length), context):
+                engine._journal_entry(current['StarSystem'], dict(entry), state['NavRoute'], None)
+        if length <= ORACLE_LIMIT:
+            assert (engine.summary, engine.display) == (base.remain_label['text'], base.navroute_label['text']), \
+                context
+            assert overlay.text == base.overlay.text, context
+
+
+# Degenerate states are handled differently from the original code on purpose. The expected output is pinned here.
+
+PINNED_ROUTE = [{'StarSystem': f'S{i}', 'SystemAddress': i, 'StarClass': star, 'StarPos': [i * 10.0, 0, 0]}
+                for i, star in enumerate(['K', 'M', 'N', 'DA'])]
+
+
+def test_jump_num_zero_shows_destination_only():
+    # The original code sliced outside the route and raised IndexError
+    with pytest.raises(IndexError):
+        baseline_render(PINNED_ROUTE, 'K', 3, 0, True, True, True, False)
+    assert render_route(Route(PINNED_ROUTE), Formatter(), DisplayTemplates(), 'S0', 'K', 3, 0, False) == (
+        'NavRoute (30.0ly, 100.0% efficiency)\n 3 Jumps Remaining (30.0/30.0ly)',
+        'S0 [\N{FUEL PUMP}K] - 30.0ly -> S3 [\N{HIGH VOLTAGE SIGN}×1.5 DA]',
+        '3 Jumps (30.0/30.0ly): S0 [\N{FUEL PUMP}K] - 30.0ly -> S3 [\N{HIGH VOLTAGE SIGN}×1.5 DA]',
+    )
+
+
+def test_zero_remaining_jumps_shows_current_system_only():
+    # The original code took route[-0:] as the remaining route and indexed past the end of it
+    with pytest.raises(IndexError):
+        baseline_render(PINNED_ROUTE, 'K', 0, 3, True, True, True, False)
+    assert render_route(Route(PINNED_ROUTE), Formatter(), DisplayTemplates(), 'S0', 'K', 0, 3, False) == (
+        'NavRoute (30.0ly, 100.0% efficiency)\n 0 Jumps Remaining (0.0/30.0ly)',
+        'S0 [\N{FUEL PUMP}K]',
+        '0 Jumps (0.0/30.0ly): S0 [\N{FUEL PUMP}K]',
+    )
+
+
+def test_excess_remaining_jumps_are_clamped():
+    expected = render_route(Route(PINNED_ROUTE), Formatter(), DisplayTemplates(), 'S0', 'K', 3, 3, False)
+    assert render_route(Route(PINNED_ROUTE), Formatter(), DisplayTemplates(), 'S0', 'K', 9, 3, False) == expected
+
+
+def test_zero_distance_route_is_fully_efficient():
+    route = [dict(PINNED_ROUTE[0], StarSystem='A'), dict(PINNED_ROUTE[0], StarSystem='B', SystemAddress=1)]
+    # The original code divided by the zero total distance
+    with pytest.raises(ZeroDivisionError):
+        baseline_render(route, 'K', 1, 3, True, True, True, False)
+    assert render_route(Route(route), Formatter(), DisplayTemplates(), 'A', 'K', 1, 3, False) == (
+        'NavRoute (0.0ly, 100.0% efficiency)\n 1 Jump Remaining (0.0/0.0ly)',
+        'A [\N{FUEL PUMP}K] - 0.0ly -> B [\N{FUEL PUMP}K]',
+        '1 Jump (0.0/0.0ly): A [\N{FUEL PUMP}K] - 0.0ly -> B [\N{FUEL PUMP}K]',
+    )